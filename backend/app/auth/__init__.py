@@ -1,12 +1,15 @@
 """
 Module d'authentification
 """
-from .password import hash_password, verify_password
-from .jwt_handler import create_access_token, decode_access_token
+from .password import hash_password, verify_password, hash_password_async, verify_password_async
+from .jwt_handler import create_access_token, create_stream_token, decode_access_token
 
 __all__ = [
     'hash_password',
     'verify_password',
+    'hash_password_async',
+    'verify_password_async',
     'create_access_token',
+    'create_stream_token',
     'decode_access_token'
 ]
\ No newline at end of file
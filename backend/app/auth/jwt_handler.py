@@ -3,6 +3,9 @@ from typing import Optional
 from jose import JWTError, jwt
 from app.config import settings
 
+# Portée des tokens courts du flux /player/events (refusés partout ailleurs)
+EVENTS_SCOPE = "events"
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Crée un token JWT"""
     to_encode = data.copy()
@@ -16,6 +19,17 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
+def create_stream_token(username: str) -> str:
+    """
+    Token réservé au flux d'événements : EventSource oblige à le passer dans
+    l'URL (journaux d'accès, proxys), il ne sert donc qu'à ouvrir la connexion
+    et expire après PUSH_TOKEN_EXPIRE_SECONDS
+    """
+    return create_access_token(
+        data={"sub": username, "scope": EVENTS_SCOPE},
+        expires_delta=timedelta(seconds=settings.PUSH_TOKEN_EXPIRE_SECONDS)
+    )
+
 def decode_access_token(token: str) -> Optional[dict]:
     """Décode un token JWT"""
     try:
@@ -1,11 +1,37 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from passlib.context import CryptContext
+from app.config import settings
+from app.metrics import password_hash_duration
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt est volontairement lent : pool dédié pour ne pas bloquer la boucle asyncio
+_hash_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+
 def hash_password(password: str) -> str:
     """Hash un mot de passe"""
-    return pwd_context.hash(password)
+    start = time.perf_counter()
+    try:
+        return pwd_context.hash(password)
+    finally:
+        password_hash_duration.observe(time.perf_counter() - start, operation="hash")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Vérifie un mot de passe"""
-    return pwd_context.verify(plain_password, hashed_password)
\ No newline at end of file
+    start = time.perf_counter()
+    try:
+        return pwd_context.verify(plain_password, hashed_password)
+    finally:
+        password_hash_duration.observe(time.perf_counter() - start, operation="verify")
+
+async def hash_password_async(password: str) -> str:
+    """Hash un mot de passe sans bloquer la boucle d'événements"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Vérifie un mot de passe sans bloquer la boucle d'événements"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, verify_password, plain_password, hashed_password)
\ No newline at end of file
@@ -0,0 +1,18 @@
+"""
+Moteurs de stockage de la base de données
+"""
+from .storage_interface import IStorage, VersionConflictError, user_version
+from .json_storage import JSONStorage
+from .journal_storage import JournaledJSONStorage
+from .sharded_storage import ShardedJSONStorage
+from .sqlite_storage import SQLiteStorage
+
+__all__ = [
+    'IStorage',
+    'VersionConflictError',
+    'user_version',
+    'JSONStorage',
+    'JournaledJSONStorage',
+    'ShardedJSONStorage',
+    'SQLiteStorage'
+]
\ No newline at end of file
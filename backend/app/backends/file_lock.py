@@ -0,0 +1,55 @@
+import os
+import threading
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows : verrou limité aux threads du processus
+    fcntl = None
+
+class InterProcessLock:
+    """
+    Verrou réentrant valable entre threads et entre processus (workers).
+    Le verrou de thread est pris d'abord, puis un flock exclusif sur
+    `lock_file` à la première acquisition seulement : les appels imbriqués
+    du même thread ne se bloquent pas eux-mêmes.
+    """
+    
+    def __init__(self, lock_file: str, thread_lock: Optional[threading.RLock] = None):
+        self.lock_file = lock_file
+        self._thread_lock = thread_lock or threading.RLock()
+        self._depth = 0
+        self._fd: Optional[int] = None
+    
+    def acquire(self):
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            try:
+                fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+                if fcntl is not None:
+                    try:
+                        fcntl.flock(fd, fcntl.LOCK_EX)
+                    except BaseException:
+                        os.close(fd)
+                        raise
+            except BaseException:
+                self._thread_lock.release()
+                raise
+            self._fd = fd
+        self._depth += 1
+    
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            fd, self._fd = self._fd, None
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+        self._thread_lock.release()
+    
+    def __enter__(self):
+        self.acquire()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.release()
\ No newline at end of file
@@ -0,0 +1,173 @@
+import copy
+import logging
+import os
+from typing import Dict, List, Optional, Tuple
+from app.backends.json_storage import JSONStorage
+from app.backends.storage_interface import VersionConflictError, next_user_version
+from app import serialization
+from app.metrics import storage_bytes_read, storage_bytes_written
+
+logger = logging.getLogger(__name__)
+
+class JournaledJSONStorage(JSONStorage):
+    """
+    Variante de JSONStorage où les modifications d'utilisateurs sont ajoutées
+    à la fin d'un journal (une ligne JSON compacte par modification) au lieu de
+    réécrire tout users.json.
+    
+    users.json sert d'instantané : au démarrage on le charge puis on rejoue
+    le journal. Quand le journal dépasse `compact_threshold` entrées, il est
+    replié dans l'instantané puis vidé.
+    
+    Plusieurs workers peuvent partager les fichiers : synchronisation,
+    vérification de version, ajout au journal et compaction se font sous un
+    verrou de fichier commun (users.json.lock).
+    """
+    
+    def __init__(self, data_dir: str, users_file: str, quests_file: str,
+                 compact_threshold: int = 1000):
+        self.journal_file = users_file + ".journal"
+        self.compact_threshold = compact_threshold
+        
+        self._users_state: Dict = {}
+        self._snapshot_signature: Optional[Tuple[int, int]] = None
+        self._journal_offset = 0
+        self._journal_records = 0
+        
+        super().__init__(data_dir, users_file, quests_file)
+        
+        with self._process_lock_for(self.users_file):
+            self._repair_journal()
+            self._sync()
+    
+    def _repair_journal(self):
+        """Supprime une éventuelle dernière ligne incomplète (arrêt pendant une écriture)"""
+        if not os.path.exists(self.journal_file):
+            return
+        
+        with open(self.journal_file, 'rb') as f:
+            content = f.read()
+        
+        complete_length = content.rfind(b"\n") + 1
+        if complete_length < len(content):
+            with open(self.journal_file, 'r+b') as f:
+                f.truncate(complete_length)
+    
+    def _sync(self):
+        """
+        Met l'état mémoire à jour depuis le disque : rechargement complet si
+        l'instantané a changé (compaction par un autre worker), sinon simple
+        lecture des nouvelles lignes du journal.
+        """
+        snapshot_signature = self._file_signature(self.users_file)
+        journal_size = os.path.getsize(self.journal_file) if os.path.exists(self.journal_file) else 0
+        
+        if snapshot_signature != self._snapshot_signature or journal_size < self._journal_offset:
+            self._users_state = serialization.read_file(self.users_file) or {}
+            self._snapshot_signature = snapshot_signature
+            self._journal_offset = 0
+            self._journal_records = 0
+        
+        if journal_size > self._journal_offset:
+            self._replay_journal()
+    
+    def _replay_journal(self):
+        with open(self.journal_file, 'rb') as f:
+            f.seek(self._journal_offset)
+            chunk = f.read()
+        storage_bytes_read.inc(len(chunk), source="journal")
+        
+        # On ne rejoue que les lignes complètes
+        complete_length = chunk.rfind(b"\n") + 1
+        for line in chunk[:complete_length].splitlines():
+            if not line.strip():
+                continue
+            try:
+                self._apply(serialization.loads(line))
+            except (ValueError, KeyError, TypeError) as e:
+                # Une entrée illisible est ignorée, comme une ligne tronquée
+                logger.warning("Entrée du journal %s ignorée: %s", self.journal_file, e)
+                continue
+            self._journal_records += 1
+        
+        self._journal_offset += complete_length
+    
+    def _apply(self, record: Dict):
+        if record["op"] == "put":
+            self._users_state[record["username"]] = record["data"]
+        else:
+            raise ValueError(f"opération inconnue: {record['op']}")
+    
+    def _append(self, *records: Dict):
+        # Toujours du JSON compact : une entrée par ligne, sans retour à la ligne interne
+        lines = b"".join(serialization.dumps(record, "compact") + b"\n" for record in records)
+        
+        # Un lot d'entrées = une seule écriture et un seul fsync
+        with open(self.journal_file, 'ab') as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        storage_bytes_written.inc(len(lines), source="journal")
+        
+        for record in records:
+            self._apply(record)
+        self._journal_offset += len(lines)
+        self._journal_records += len(records)
+    
+    def compact(self):
+        """Replie le journal dans l'instantané users.json puis vide le journal"""
+        with self._process_lock_for(self.users_file):
+            self._sync()
+            
+            # Écriture atomique de l'instantané
+            serialization.write_file(self.users_file, self._users_state)
+            
+            # Les entrées "put" sont idempotentes : un arrêt entre ces deux
+            # étapes ne fait que rejouer des modifications déjà présentes
+            open(self.journal_file, 'w').close()
+            
+            self._snapshot_signature = self._file_signature(self.users_file)
+            self._journal_offset = 0
+            self._journal_records = 0
+    
+    # Users
+    def _users(self) -> Dict:
+        with self._process_lock_for(self.users_file):
+            self._sync()
+            return self._users_state
+    
+    def save_user(self, username: str, user_data: Dict, expected_version: Optional[int] = None) -> int:
+        with self._process_lock_for(self.users_file):
+            self._sync()
+            version = next_user_version(username, self._users_state.get(username), expected_version)
+            self._append({
+                "op": "put",
+                "username": username,
+                "data": dict(copy.deepcopy(user_data), version=version)
+            })
+            
+            if self._journal_records >= self.compact_threshold:
+                self.compact()
+        return version
+    
+    def save_users(self, updates: List[Tuple[str, Dict, Optional[int]]]) -> Dict[str, int]:
+        with self._process_lock_for(self.users_file):
+            self._sync()
+            records, versions = [], {}
+            for username, user_data, expected_version in updates:
+                try:
+                    version = next_user_version(username, self._users_state.get(username), expected_version)
+                except VersionConflictError:
+                    continue
+                records.append({
+                    "op": "put",
+                    "username": username,
+                    "data": dict(copy.deepcopy(user_data), version=version)
+                })
+                versions[username] = version
+            
+            if records:
+                self._append(*records)
+                if self._journal_records >= self.compact_threshold:
+                    self.compact()
+        return versions
\ No newline at end of file
@@ -0,0 +1,220 @@
+import copy
+import os
+import threading
+from typing import List, Dict, Optional, Tuple
+from app.backends.file_lock import InterProcessLock
+from app.backends.storage_interface import IStorage, apply_user_updates, next_user_version
+from app import serialization
+
+class JSONStorage(IStorage):
+    """Stockage dans deux fichiers JSON (users.json / quests_db.json)"""
+    
+    def __init__(self, data_dir: str, users_file: str, quests_file: str):
+        self.data_dir = data_dir
+        self.users_file = users_file
+        self.quests_file = quests_file
+        # Compteur d'IDs de quêtes persistant (data/quests_db_meta.json)
+        self.quests_meta_file = os.path.splitext(quests_file)[0] + "_meta.json"
+        
+        # Index id -> position, reconstruit quand la liste en cache change
+        self._indexed_quests: Optional[List[Dict]] = None
+        self._quest_positions: Dict[int, int] = {}
+        self._max_quest_id = 0
+        
+        # Cache mémoire : chemin -> (mtime_ns, taille, données parsées)
+        self._cache: Dict[str, Tuple[int, int, any]] = {}
+        # Un verrou par fichier : des fichiers différents s'écrivent en parallèle
+        self._file_locks: Dict[str, threading.RLock] = {}
+        self._process_locks: Dict[str, InterProcessLock] = {}
+        self._file_locks_guard = threading.Lock()
+        self._ensure_data_directory()
+        self._ensure_files()
+    
+    def _ensure_data_directory(self):
+        if not os.path.exists(self.data_dir):
+            os.makedirs(self.data_dir)
+    
+    def _ensure_files(self):
+        if not os.path.exists(self.users_file):
+            self._save_json(self.users_file, {})
+        
+        if not os.path.exists(self.quests_file):
+            self._save_json(self.quests_file, [])
+    
+    def _lock_for(self, filepath: str) -> threading.RLock:
+        with self._file_locks_guard:
+            lock = self._file_locks.get(filepath)
+            if lock is None:
+                lock = self._file_locks[filepath] = threading.RLock()
+            return lock
+    
+    def _process_lock_for(self, filepath: str) -> InterProcessLock:
+        """
+        Verrou du fichier partagé avec les autres workers (flock sur
+        `filepath`.lock), pour les séquences lecture-vérification-écriture
+        """
+        thread_lock = self._lock_for(filepath)
+        with self._file_locks_guard:
+            lock = self._process_locks.get(filepath)
+            if lock is None:
+                lock = self._process_locks[filepath] = InterProcessLock(filepath + ".lock", thread_lock)
+            return lock
+    
+    def _file_signature(self, filepath: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(filepath)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
+    def _load_json(self, filepath: str) -> any:
+        """
+        Charge un fichier de données en passant par le cache mémoire.
+        Le fichier n'est re-parsé que si son mtime ou sa taille a changé
+        (modification externe, autre worker...).
+        """
+        with self._lock_for(filepath):
+            signature = self._file_signature(filepath)
+            if signature is None:
+                self._cache.pop(filepath, None)
+                return None
+            
+            cached = self._cache.get(filepath)
+            if cached is not None and cached[:2] == signature:
+                return cached[2]
+            
+            try:
+                data = serialization.read_file(filepath)
+            except (FileNotFoundError, ValueError):
+                self._cache.pop(filepath, None)
+                return None
+            
+            self._cache[filepath] = (signature[0], signature[1], data)
+            return data
+    
+    def _save_json(self, filepath: str, data: any):
+        with self._lock_for(filepath):
+            serialization.write_file(filepath, data)
+            
+            # Write-through : le cache reflète directement ce qui vient d'être écrit
+            signature = self._file_signature(filepath)
+            if signature is not None:
+                self._cache[filepath] = (signature[0], signature[1], data)
+    
+    # Users
+    def _users(self) -> Dict:
+        """Dictionnaire des utilisateurs en cache (ne pas modifier directement)"""
+        return self._load_json(self.users_file) or {}
+    
+    def get_all_users(self) -> Dict:
+        return copy.deepcopy(self._users())
+    
+    def get_user(self, username: str) -> Optional[Dict]:
+        user = self._users().get(username)
+        return copy.deepcopy(user) if user is not None else None
+    
+    def save_user(self, username: str, user_data: Dict, expected_version: Optional[int] = None) -> int:
+        # Vérification de version et écriture sous le verrou partagé avec les autres workers
+        with self._process_lock_for(self.users_file):
+            users = dict(self._users())
+            version = next_user_version(username, users.get(username), expected_version)
+            users[username] = dict(copy.deepcopy(user_data), version=version)
+            self._save_json(self.users_file, users)
+        return version
+    
+    def save_users(self, updates: List[Tuple[str, Dict, Optional[int]]]) -> Dict[str, int]:
+        # Un seul chargement et une seule réécriture de users.json pour tout le lot
+        with self._process_lock_for(self.users_file):
+            users = dict(self._users())
+            versions = apply_user_updates(users, updates)
+            if versions:
+                self._save_json(self.users_file, users)
+        return versions
+    
+    def user_exists(self, username: str) -> bool:
+        return username in self._users()
+    
+    # Quests
+    def _quests(self) -> List[Dict]:
+        """Liste des quêtes en cache (ne pas modifier directement)"""
+        return self._load_json(self.quests_file) or []
+    
+    def _quest_index(self) -> Tuple[List[Dict], Dict[int, int]]:
+        """
+        Liste des quêtes et index id -> position (première occurrence).
+        L'index n'est reconstruit que lorsque la liste en cache est remplacée
+        (écriture ou rechargement depuis le disque).
+        """
+        with self._lock_for(self.quests_file):
+            quests = self._quests()
+            if quests is not self._indexed_quests:
+                positions = {}
+                for i, quest in enumerate(quests):
+                    positions.setdefault(quest.get("id"), i)
+                self._quest_positions = positions
+                self._max_quest_id = max((qid for qid in positions if isinstance(qid, int)), default=0)
+                self._indexed_quests = quests
+            return quests, self._quest_positions
+    
+    def get_all_quests(self) -> List[Dict]:
+        return copy.deepcopy(self._quests())
+    
+    def get_quest(self, quest_id: int) -> Optional[Dict]:
+        quests, positions = self._quest_index()
+        position = positions.get(quest_id)
+        return copy.deepcopy(quests[position]) if position is not None else None
+    
+    # Écritures du catalogue (et du compteur d'IDs) sous le verrou partagé avec les autres workers
+    def save_quests(self, quests: List[Dict]):
+        with self._process_lock_for(self.quests_file):
+            self._save_json(self.quests_file, copy.deepcopy(quests))
+    
+    def add_quest(self, quest_data: Dict) -> Dict:
+        with self._process_lock_for(self.quests_file):
+            quests = list(self._quests())
+            quests.append(copy.deepcopy(quest_data))
+            self._save_json(self.quests_file, quests)
+        return quest_data
+    
+    def update_quest(self, quest_id: int, quest_data: Dict) -> Optional[Dict]:
+        with self._process_lock_for(self.quests_file):
+            quests, positions = self._quest_index()
+            position = positions.get(quest_id)
+            if position is None:
+                return None
+            
+            quests = list(quests)
+            quests[position] = copy.deepcopy(quest_data)
+            self._save_json(self.quests_file, quests)
+        return quest_data
+    
+    def delete_quest(self, quest_id: int) -> bool:
+        with self._process_lock_for(self.quests_file):
+            quests, positions = self._quest_index()
+            if quest_id not in positions:
+                return False
+            
+            self._save_json(self.quests_file, [q for q in quests if q.get("id") != quest_id])
+        return True
+    
+    def get_quests_version(self) -> str:
+        # Signature (mtime, taille) du fichier telle que vue par le cache
+        with self._lock_for(self.quests_file):
+            self._quests()
+            cached = self._cache.get(self.quests_file)
+            return f"{cached[0]:x}-{cached[1]:x}" if cached else "0"
+    
+    def get_next_quest_id(self) -> int:
+        with self._lock_for(self.quests_file):
+            self._quest_index()
+            meta = self._load_json(self.quests_meta_file) or {}
+            return max(meta.get("next_quest_id", 1), self._max_quest_id + 1)
+    
+    def create_quest(self, quest_data: Dict) -> Dict:
+        with self._process_lock_for(self.quests_file):
+            new_id = self.get_next_quest_id()
+            self._save_json(self.quests_meta_file, {"next_quest_id": new_id + 1})
+            
+            quest = dict(copy.deepcopy(quest_data), id=new_id)
+            self._save_json(self.quests_file, list(self._quests()) + [quest])
+        return copy.deepcopy(quest)
\ No newline at end of file
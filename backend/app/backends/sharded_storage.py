@@ -0,0 +1,114 @@
+import copy
+import os
+import zlib
+from typing import Dict, List, Optional, Iterator, Tuple
+from app.backends.json_storage import JSONStorage
+from app.backends.storage_interface import apply_user_updates, next_user_version
+
+class ShardedJSONStorage(JSONStorage):
+    """
+    Variante de JSONStorage où les utilisateurs sont répartis dans
+    `shard_count` fichiers (users_000.json, users_001.json...) selon un hash
+    stable du username. Lire ou écrire un joueur ne touche que son fichier,
+    et deux joueurs de fichiers différents s'écrivent en parallèle.
+    Les quêtes restent dans quests_db.json.
+    """
+    
+    META_FILE = "_meta.json"
+    
+    def __init__(self, data_dir: str, shards_dir: str, quests_file: str, shard_count: int = 16):
+        if shard_count < 1:
+            raise ValueError("Le nombre de shards doit être au moins 1")
+        
+        self.shards_dir = shards_dir
+        self.shard_count = shard_count
+        super().__init__(data_dir, users_file=os.path.join(shards_dir, self.META_FILE), quests_file=quests_file)
+    
+    def _ensure_files(self):
+        if not os.path.exists(self.shards_dir):
+            os.makedirs(self.shards_dir)
+        
+        # Le nombre de shards ne peut pas changer sans migration
+        meta_file = os.path.join(self.shards_dir, self.META_FILE)
+        meta = self._load_json(meta_file)
+        if meta is None:
+            self._save_json(meta_file, {"shard_count": self.shard_count})
+        elif meta.get("shard_count") != self.shard_count:
+            raise ValueError(
+                f"{self.shards_dir} contient {meta.get('shard_count')} shards, "
+                f"la configuration en demande {self.shard_count}"
+            )
+        
+        if not os.path.exists(self.quests_file):
+            self._save_json(self.quests_file, [])
+    
+    def shard_index(self, username: str) -> int:
+        """Index du shard d'un utilisateur (crc32 : stable d'un processus à l'autre)"""
+        return zlib.crc32(username.encode('utf-8')) % self.shard_count
+    
+    def shard_file(self, index: int) -> str:
+        return os.path.join(self.shards_dir, f"users_{index:03d}.json")
+    
+    def _shard(self, index: int) -> Dict:
+        """Contenu d'un shard en cache (ne pas modifier directement)"""
+        return self._load_json(self.shard_file(index)) or {}
+    
+    # Users
+    def _users(self) -> Dict:
+        users = {}
+        for index in range(self.shard_count):
+            users.update(self._shard(index))
+        return users
+    
+    def iter_users(self) -> Iterator[Tuple[str, Dict]]:
+        for index in range(self.shard_count):
+            for username, user_data in list(self._shard(index).items()):
+                yield username, copy.deepcopy(user_data)
+    
+    def get_user(self, username: str) -> Optional[Dict]:
+        user = self._shard(self.shard_index(username)).get(username)
+        return copy.deepcopy(user) if user is not None else None
+    
+    def save_user(self, username: str, user_data: Dict, expected_version: Optional[int] = None) -> int:
+        shard_file = self.shard_file(self.shard_index(username))
+        with self._process_lock_for(shard_file):
+            users = dict(self._load_json(shard_file) or {})
+            version = next_user_version(username, users.get(username), expected_version)
+            users[username] = dict(copy.deepcopy(user_data), version=version)
+            self._save_json(shard_file, users)
+        return version
+    
+    def save_users(self, updates: List[Tuple[str, Dict, Optional[int]]]) -> Dict[str, int]:
+        # Une écriture par shard concerné
+        buckets: Dict[int, List] = {}
+        for update in updates:
+            buckets.setdefault(self.shard_index(update[0]), []).append(update)
+        
+        versions = {}
+        for index, shard_updates in sorted(buckets.items()):
+            shard_file = self.shard_file(index)
+            with self._process_lock_for(shard_file):
+                users = dict(self._load_json(shard_file) or {})
+                shard_versions = apply_user_updates(users, shard_updates)
+                if shard_versions:
+                    self._save_json(shard_file, users)
+            versions.update(shard_versions)
+        return versions
+    
+    def user_exists(self, username: str) -> bool:
+        return username in self._shard(self.shard_index(username))
+    
+    def import_users(self, users: Dict) -> int:
+        """Écrit d'un coup un dictionnaire d'utilisateurs (migration), un fichier par shard"""
+        buckets = [{} for _ in range(self.shard_count)]
+        for username, user_data in users.items():
+            buckets[self.shard_index(username)][username] = user_data
+        
+        for index, bucket in enumerate(buckets):
+            shard_file = self.shard_file(index)
+            with self._process_lock_for(shard_file):
+                merged = dict(self._load_json(shard_file) or {})
+                merged.update(bucket)
+                self._save_json(shard_file, merged)
+        
+        return len(users)
\ No newline at end of file
@@ -0,0 +1,235 @@
+import os
+import sqlite3
+import threading
+from typing import List, Dict, Optional, Iterator, Tuple
+from app.backends.storage_interface import IStorage, VersionConflictError, next_user_version
+from app import serialization
+from app.metrics import storage_bytes_read, storage_bytes_written
+
+class SQLiteStorage(IStorage):
+    """
+    Stockage SQLite : une ligne par utilisateur et par quête.
+    Les recherches par username et par ID de quête passent par un index,
+    et chaque écriture ne touche que la ligne concernée.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS users (
+            username TEXT PRIMARY KEY,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS quests (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            id INTEGER NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_quests_id ON quests(id);
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        );
+    """
+    
+    def __init__(self, db_file: str, import_users_file: Optional[str] = None,
+                 import_quests_file: Optional[str] = None):
+        self.db_file = db_file
+        # Une connexion par thread (sqlite3 ne partage pas ses connexions)
+        self._local = threading.local()
+        self._ensure_data_directory()
+        
+        with self._connection() as conn:
+            conn.executescript(self.SCHEMA)
+        
+        self._import_json_if_empty(import_users_file, import_quests_file)
+    
+    def _ensure_data_directory(self):
+        directory = os.path.dirname(self.db_file)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+    
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_file)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+    
+    def _import_json_if_empty(self, users_file: Optional[str], quests_file: Optional[str]):
+        """Reprend les fichiers JSON existants lors du premier démarrage en SQLite"""
+        conn = self._connection()
+        has_users = conn.execute("SELECT 1 FROM users LIMIT 1").fetchone()
+        has_quests = conn.execute("SELECT 1 FROM quests LIMIT 1").fetchone()
+        
+        if not has_users and users_file and os.path.exists(users_file):
+            users = serialization.read_file(users_file) or {}
+            with conn:
+                conn.executemany(
+                    "INSERT INTO users (username, data) VALUES (?, ?)",
+                    [(username, self._dumps(data)) for username, data in users.items()]
+                )
+        
+        if not has_quests and quests_file and os.path.exists(quests_file):
+            quests = serialization.read_file(quests_file) or []
+            self.save_quests(quests)
+    
+    def _dumps(self, data: any) -> str:
+        raw = serialization.dumps(data, "compact")
+        storage_bytes_written.inc(len(raw), source="sqlite")
+        return raw.decode('utf-8')
+    
+    def _loads(self, data: str) -> any:
+        raw = data.encode('utf-8')
+        storage_bytes_read.inc(len(raw), source="sqlite")
+        return serialization.loads(raw)
+    
+    # Users
+    def get_all_users(self) -> Dict:
+        rows = self._connection().execute("SELECT username, data FROM users ORDER BY rowid")
+        return {username: self._loads(data) for username, data in rows}
+    
+    def iter_users(self, batch_size: int = 500) -> Iterator[Tuple[str, Dict]]:
+        # Lecture par lots : l'appelant peut modifier des utilisateurs pendant le parcours
+        last_rowid = 0
+        while True:
+            rows = self._connection().execute(
+                "SELECT rowid, username, data FROM users WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                (last_rowid, batch_size)
+            ).fetchall()
+            if not rows:
+                return
+            for last_rowid, username, data in rows:
+                yield username, self._loads(data)
+    
+    def get_user(self, username: str) -> Optional[Dict]:
+        row = self._connection().execute(
+            "SELECT data FROM users WHERE username = ?", (username,)
+        ).fetchone()
+        return self._loads(row[0]) if row else None
+    
+    def save_user(self, username: str, user_data: Dict, expected_version: Optional[int] = None) -> int:
+        conn = self._connection()
+        with conn:
+            # BEGIN IMMEDIATE : lecture de la version et écriture sous le même verrou d'écriture
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT data FROM users WHERE username = ?", (username,)).fetchone()
+            version = next_user_version(username, self._loads(row[0]) if row else None, expected_version)
+            conn.execute(
+                "INSERT INTO users (username, data) VALUES (?, ?) "
+                "ON CONFLICT(username) DO UPDATE SET data = excluded.data",
+                (username, self._dumps(dict(user_data, version=version)))
+            )
+        return version
+    
+    def save_users(self, updates: List[Tuple[str, Dict, Optional[int]]]) -> Dict[str, int]:
+        conn = self._connection()
+        versions, rows = {}, []
+        with conn:
+            # Tout le lot dans une seule transaction d'écriture
+            conn.execute("BEGIN IMMEDIATE")
+            for username, user_data, expected_version in updates:
+                row = conn.execute("SELECT data FROM users WHERE username = ?", (username,)).fetchone()
+                try:
+                    version = next_user_version(username, self._loads(row[0]) if row else None, expected_version)
+                except VersionConflictError:
+                    continue
+                rows.append((username, self._dumps(dict(user_data, version=version))))
+                versions[username] = version
+            
+            conn.executemany(
+                "INSERT INTO users (username, data) VALUES (?, ?) "
+                "ON CONFLICT(username) DO UPDATE SET data = excluded.data",
+                rows
+            )
+        return versions
+    
+    def user_exists(self, username: str) -> bool:
+        row = self._connection().execute(
+            "SELECT 1 FROM users WHERE username = ?", (username,)
+        ).fetchone()
+        return row is not None
+    
+    # Quests
+    def get_all_quests(self) -> List[Dict]:
+        rows = self._connection().execute("SELECT data FROM quests ORDER BY seq")
+        return [self._loads(data) for (data,) in rows]
+    
+    def get_quest(self, quest_id: int) -> Optional[Dict]:
+        row = self._connection().execute(
+            "SELECT data FROM quests WHERE id = ? ORDER BY seq LIMIT 1", (quest_id,)
+        ).fetchone()
+        return self._loads(row[0]) if row else None
+    
+    def _bump_quests_version(self, conn: sqlite3.Connection):
+        """À appeler dans la transaction de chaque modification de quêtes"""
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('quests_version', 1) "
+            "ON CONFLICT(key) DO UPDATE SET value = value + 1"
+        )
+    
+    def save_quests(self, quests: List[Dict]):
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM quests")
+            conn.executemany(
+                "INSERT INTO quests (id, data) VALUES (?, ?)",
+                [(q.get("id", 0), self._dumps(q)) for q in quests]
+            )
+            self._bump_quests_version(conn)
+    
+    def add_quest(self, quest_data: Dict) -> Dict:
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT INTO quests (id, data) VALUES (?, ?)",
+                (quest_data.get("id", 0), self._dumps(quest_data))
+            )
+            self._bump_quests_version(conn)
+        return quest_data
+    
+    def update_quest(self, quest_id: int, quest_data: Dict) -> Optional[Dict]:
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute(
+                "UPDATE quests SET id = ?, data = ? WHERE seq = "
+                "(SELECT seq FROM quests WHERE id = ? ORDER BY seq LIMIT 1)",
+                (quest_data.get("id", quest_id), self._dumps(quest_data), quest_id)
+            )
+            if cursor.rowcount:
+                self._bump_quests_version(conn)
+        return quest_data if cursor.rowcount else None
+    
+    def delete_quest(self, quest_id: int) -> bool:
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute("DELETE FROM quests WHERE id = ?", (quest_id,))
+            if cursor.rowcount:
+                self._bump_quests_version(conn)
+        return cursor.rowcount > 0
+    
+    def get_quests_version(self) -> str:
+        row = self._connection().execute("SELECT value FROM meta WHERE key = 'quests_version'").fetchone()
+        return str(row[0] if row else 0)
+    
+    def get_next_quest_id(self) -> int:
+        conn = self._connection()
+        counter = conn.execute("SELECT value FROM meta WHERE key = 'next_quest_id'").fetchone()
+        max_id = conn.execute("SELECT MAX(id) FROM quests").fetchone()[0] or 0
+        return max(counter[0] if counter else 1, max_id + 1)
+    
+    def create_quest(self, quest_data: Dict) -> Dict:
+        conn = self._connection()
+        with conn:
+            # Réservation de l'ID et insertion dans la même transaction d'écriture
+            conn.execute("BEGIN IMMEDIATE")
+            new_id = self.get_next_quest_id()
+            quest = dict(quest_data, id=new_id)
+            conn.execute("INSERT INTO quests (id, data) VALUES (?, ?)", (new_id, self._dumps(quest)))
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('next_quest_id', ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (new_id + 1,)
+            )
+            self._bump_quests_version(conn)
+        return quest
\ No newline at end of file
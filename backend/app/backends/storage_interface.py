@@ -0,0 +1,150 @@
+import copy
+from abc import ABC, abstractmethod
+from typing import List, Dict, Optional, Iterator, Tuple
+
+class VersionConflictError(Exception):
+    """Levée quand un utilisateur a été modifié entre sa lecture et sa sauvegarde"""
+    
+    def __init__(self, username: str, expected_version: int, current_version: int):
+        super().__init__(
+            f"Conflit de version pour {username}: attendu {expected_version}, trouvé {current_version}"
+        )
+        self.username = username
+        self.expected_version = expected_version
+        self.current_version = current_version
+
+def user_version(user_data: Optional[Dict]) -> int:
+    """
+    Version d'un enregistrement utilisateur : 0 s'il n'existe pas, et au
+    moins 1 sinon (les enregistrements antérieurs au versionnage comptent
+    comme version 1). expected_version=0 garantit donc une création.
+    """
+    if user_data is None:
+        return 0
+    return max(user_data.get("version", 0), 1)
+
+def next_user_version(username: str, current: Optional[Dict], expected_version: Optional[int]) -> int:
+    """Vérifie la version attendue (compare-and-swap) et retourne la version à enregistrer"""
+    current_version = user_version(current)
+    if expected_version is not None and expected_version != current_version:
+        raise VersionConflictError(username, expected_version, current_version)
+    return current_version + 1
+
+def apply_user_updates(users: Dict, updates: List[Tuple[str, Dict, Optional[int]]]) -> Dict[str, int]:
+    """
+    Applique un lot de sauvegardes à un dictionnaire username -> données
+    (moteurs fichiers), en ignorant les entrées en conflit de version.
+    Retourne username -> nouvelle version pour les entrées appliquées.
+    """
+    versions = {}
+    for username, user_data, expected_version in updates:
+        try:
+            version = next_user_version(username, users.get(username), expected_version)
+        except VersionConflictError:
+            continue
+        users[username] = dict(copy.deepcopy(user_data), version=version)
+        versions[username] = version
+    return versions
+
+class IStorage(ABC):
+    """Interface commune à tous les moteurs de stockage"""
+    
+    # Users
+    @abstractmethod
+    def get_all_users(self) -> Dict:
+        """Retourne tous les utilisateurs (username -> données)"""
+        pass
+    
+    def iter_users(self) -> Iterator[Tuple[str, Dict]]:
+        """
+        Parcourt les utilisateurs (username, données) un par un.
+        Les moteurs qui le peuvent évitent de tout charger en mémoire.
+        """
+        yield from self.get_all_users().items()
+    
+    @abstractmethod
+    def get_user(self, username: str) -> Optional[Dict]:
+        """Retourne les données d'un utilisateur ou None"""
+        pass
+    
+    @abstractmethod
+    def save_user(self, username: str, user_data: Dict, expected_version: Optional[int] = None) -> int:
+        """
+        Crée ou remplace un utilisateur et incrémente sa version.
+        Si expected_version est fourni et ne correspond pas à la version
+        stockée, lève VersionConflictError sans rien écrire.
+        Retourne la nouvelle version.
+        """
+        pass
+    
+    def save_users(self, updates: List[Tuple[str, Dict, Optional[int]]]) -> Dict[str, int]:
+        """
+        Enregistre plusieurs utilisateurs (username, données, version attendue)
+        en une seule écriture quand le moteur le permet. Les entrées dont la
+        version a changé sont ignorées, les autres sont écrites.
+        Retourne username -> nouvelle version pour les entrées enregistrées.
+        """
+        versions = {}
+        for username, user_data, expected_version in updates:
+            try:
+                versions[username] = self.save_user(username, user_data, expected_version)
+            except VersionConflictError:
+                continue
+        return versions
+    
+    @abstractmethod
+    def user_exists(self, username: str) -> bool:
+        """Vérifie si un utilisateur existe"""
+        pass
+    
+    # Quests
+    @abstractmethod
+    def get_all_quests(self) -> List[Dict]:
+        """Retourne toutes les quêtes dans leur ordre de stockage"""
+        pass
+    
+    @abstractmethod
+    def get_quest(self, quest_id: int) -> Optional[Dict]:
+        """Retourne une quête par son ID ou None"""
+        pass
+    
+    @abstractmethod
+    def save_quests(self, quests: List[Dict]):
+        """Remplace l'ensemble des quêtes"""
+        pass
+    
+    @abstractmethod
+    def add_quest(self, quest_data: Dict) -> Dict:
+        """Ajoute une quête"""
+        pass
+    
+    @abstractmethod
+    def update_quest(self, quest_id: int, quest_data: Dict) -> Optional[Dict]:
+        """Remplace une quête existante, retourne None si introuvable"""
+        pass
+    
+    @abstractmethod
+    def delete_quest(self, quest_id: int) -> bool:
+        """Supprime une quête, retourne False si introuvable"""
+        pass
+    
+    @abstractmethod
+    def get_quests_version(self) -> str:
+        """
+        Jeton qui change à chaque modification du catalogue de quêtes,
+        y compris par un autre processus (sert à invalider les caches)
+        """
+        pass
+    
+    @abstractmethod
+    def get_next_quest_id(self) -> int:
+        """Retourne le prochain ID de quête disponible (sans le réserver)"""
+        pass
+    
+    @abstractmethod
+    def create_quest(self, quest_data: Dict) -> Dict:
+        """
+        Réserve un nouvel ID (compteur monotone persistant, jamais réutilisé)
+        et ajoute la quête en une seule opération. Retourne la quête avec son ID.
+        """
+        pass
\ No newline at end of file
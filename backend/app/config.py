@@ -19,6 +19,49 @@ class Settings(BaseSettings):
     QUESTS_DB_FILE: str = "data/quests_db.json"
     USERS_DB_FILE: str = "data/users.json"
     
+    # Moteur de stockage : "json" (par défaut), "journal", "sharded" ou "sqlite"
+    STORAGE_BACKEND: str = "json"
+    SQLITE_DB_FILE: str = "data/quest_manager.sqlite3"
+    JOURNAL_COMPACT_THRESHOLD: int = 1000
+    USERS_SHARDS_DIR: str = "data/users"
+    USER_SHARDS: int = 16
+    
+    # Format des fichiers de données : "json" (indenté), "compact" ou "msgpack"
+    DATA_FORMAT: str = "json"
+    
+    # Pools de threads (I/O stockage et hachage bcrypt hors boucle asyncio)
+    STORAGE_IO_WORKERS: int = 8
+    PASSWORD_HASH_WORKERS: int = 2
+    
+    # Concurrence des écritures joueurs (verrous par bande + versions)
+    USER_LOCK_STRIPES: int = 64
+    USER_WRITE_RETRIES: int = 5
+    
+    # Nombre de joueurs dont l'état des quêtes (disponibles/terminées/verrouillées) est gardé en cache
+    PLAYER_STATE_CACHE_SIZE: int = 10000
+    
+    # Compression gzip des réponses (si le client l'accepte) au-delà de GZIP_MINIMUM_SIZE octets
+    GZIP_ENABLED: bool = False
+    GZIP_MINIMUM_SIZE: int = 1024
+    
+    # Notifications poussées aux joueurs (server-sent events, /player/events)
+    PUSH_MAX_CONNECTIONS: int = 10000
+    PUSH_QUEUE_SIZE: int = 64
+    PUSH_HEARTBEAT_SECONDS: int = 15
+    PUSH_TOKEN_EXPIRE_SECONDS: int = 60
+    
+    # Instrumentation : en-tête Server-Timing, seuil de log des requêtes lentes,
+    # et une ligne émise sur HOT_LOG_SAMPLE_EVERY dans les boucles (debug)
+    SERVER_TIMING_HEADER: bool = True
+    SLOW_REQUEST_MS: int = 1000
+    HOT_LOG_SAMPLE_EVERY: int = 100
+    
+    # Endpoint /metrics (format Prometheus, désactivé par défaut), jeton exigé s'il est défini
+    # (Authorization: Bearer ...) et intervalle de mesure du retard de la boucle asyncio (s)
+    METRICS_ENABLED: bool = False
+    METRICS_TOKEN: str = ""
+    EVENT_LOOP_LAG_INTERVAL: float = 0.5
+    
     @property
     def cors_origins_list(self) -> List[str]:
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
@@ -1,98 +1,315 @@
-import json
-import os
-from typing import List, Dict, Optional
+import asyncio
+import contextlib
+import contextvars
+import copy
+import functools
+import logging
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List, Dict, Optional, Iterator, Tuple, TypeVar
 from app.config import settings
+from app.backends import (
+    IStorage, JSONStorage, JournaledJSONStorage, ShardedJSONStorage, SQLiteStorage,
+    VersionConflictError, user_version
+)
+from app.models.user import User
+from app.instrumentation import timed_operation
 
-class Database:
-    """Gestionnaire de base de données JSON"""
-    
-    def __init__(self):
-        self._ensure_data_directory()
-        self._ensure_files()
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+def create_storage(engine: str) -> IStorage:
+    """Instancie le moteur de stockage choisi dans la configuration"""
+    if engine == "json":
+        return JSONStorage(
+            data_dir=settings.DATA_DIR,
+            users_file=settings.USERS_DB_FILE,
+            quests_file=settings.QUESTS_DB_FILE
+        )
+    elif engine == "journal":
+        return JournaledJSONStorage(
+            data_dir=settings.DATA_DIR,
+            users_file=settings.USERS_DB_FILE,
+            quests_file=settings.QUESTS_DB_FILE,
+            compact_threshold=settings.JOURNAL_COMPACT_THRESHOLD
+        )
+    elif engine == "sharded":
+        return ShardedJSONStorage(
+            data_dir=settings.DATA_DIR,
+            shards_dir=settings.USERS_SHARDS_DIR,
+            quests_file=settings.QUESTS_DB_FILE,
+            shard_count=settings.USER_SHARDS
+        )
+    elif engine == "sqlite":
+        return SQLiteStorage(
+            db_file=settings.SQLITE_DB_FILE,
+            import_users_file=settings.USERS_DB_FILE,
+            import_quests_file=settings.QUESTS_DB_FILE
+        )
     
-    def _ensure_data_directory(self):
-        if not os.path.exists(settings.DATA_DIR):
-            os.makedirs(settings.DATA_DIR)
+    raise ValueError(f"Moteur de stockage inconnu: {engine} (json, journal, sharded ou sqlite)")
+
+class Database:
+    """Point d'accès unique aux données, délègue au moteur de stockage configuré"""
     
-    def _ensure_files(self):
-        if not os.path.exists(settings.USERS_DB_FILE):
-            self._save_json(settings.USERS_DB_FILE, {})
+    def __init__(self, storage: Optional[IStorage] = None):
+        self.storage = storage or create_storage(settings.STORAGE_BACKEND)
+        
+        # Verrous par "bande" de joueurs : deux joueurs différents ne se bloquent
+        # (presque) jamais, deux requêtes du même joueur sont sérialisées
+        self._user_locks = [threading.Lock() for _ in range(settings.USER_LOCK_STRIPES)]
         
-        if not os.path.exists(settings.QUESTS_DB_FILE):
-            self._save_json(settings.QUESTS_DB_FILE, [])
+        # Rappels (username, données avant, User sauvegardé) après chaque modify_user
+        self._save_listeners: List[Callable[[str, Dict, User], None]] = []
     
-    def _load_json(self, filepath: str) -> any:
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return None
+    def _user_lock_index(self, username: str) -> int:
+        return zlib.crc32(username.encode('utf-8')) % len(self._user_locks)
     
-    def _save_json(self, filepath: str, data: any):
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+    def _user_lock(self, username: str) -> threading.Lock:
+        return self._user_locks[self._user_lock_index(username)]
     
     # Users
+    @timed_operation("storage.get_all_users")
     def get_all_users(self) -> Dict:
-        return self._load_json(settings.USERS_DB_FILE) or {}
+        return self.storage.get_all_users()
+    
+    def iter_users(self) -> Iterator[Tuple[str, Dict]]:
+        return self.storage.iter_users()
     
+    @timed_operation("storage.get_user")
     def get_user(self, username: str) -> Optional[Dict]:
-        users = self.get_all_users()
-        return users.get(username)
+        return self.storage.get_user(username)
+    
+    @timed_operation("storage.save_user")
+    def save_user(self, username: str, user_data: Dict, expected_version: Optional[int] = None) -> int:
+        return self.storage.save_user(username, user_data, expected_version)
+    
+    def update_user(self, username: str, user_data: Dict, expected_version: Optional[int] = None) -> int:
+        return self.save_user(username, user_data, expected_version)
     
-    def save_user(self, username: str, user_data: Dict):
-        users = self.get_all_users()
-        users[username] = user_data
-        self._save_json(settings.USERS_DB_FILE, users)
+    @timed_operation("storage.save_users")
+    def save_users(self, updates: List[Tuple[str, Dict, Optional[int]]]) -> Dict[str, int]:
+        return self.storage.save_users(updates)
     
-    def update_user(self, username: str, user_data: Dict):
-        self.save_user(username, user_data)
+    def add_save_listener(self, listener: Callable[[str, Dict, User], None]):
+        """Abonne un cache aux modifications de joueurs faites par modify_user"""
+        self._save_listeners.append(listener)
     
+    @timed_operation("storage.modify_user")
+    def modify_user(self, username: str, mutate: Callable[[User], T]) -> T:
+        """
+        Lecture-modification-écriture sûre d'un joueur.
+        `mutate` reçoit un User fraîchement relu et le modifie sur place ; la
+        sauvegarde est conditionnée à la version lue. Si un autre worker a
+        écrit entre-temps, on relit et on rejoue `mutate` (au plus
+        USER_WRITE_RETRIES fois) : la version est vérifiée sous un verrou de
+        fichier partagé (flock) pour les moteurs JSON, dans une transaction
+        BEGIN IMMEDIATE pour SQLite. Rien n'est écrit si `mutate` ne change rien.
+        Retourne la valeur renvoyée par `mutate`.
+        """
+        with self._user_lock(username):
+            for attempt in range(settings.USER_WRITE_RETRIES):
+                user_data = self.storage.get_user(username)
+                if user_data is None:
+                    # Absent d'une lecture faite hors verrou : on relit avant de conclure
+                    if attempt < settings.USER_WRITE_RETRIES - 1:
+                        continue
+                    raise KeyError(username)
+                
+                user = User.from_dict(user_data)
+                before = copy.deepcopy(user.to_dict())
+                result = mutate(user)
+                
+                if user.to_dict() == before:
+                    return result
+                
+                try:
+                    user.version = self.storage.save_user(
+                        username, user.to_dict(), expected_version=user_version(user_data)
+                    )
+                except VersionConflictError:
+                    if attempt == settings.USER_WRITE_RETRIES - 1:
+                        raise
+                    continue
+                
+                for listener in self._save_listeners:
+                    listener(username, before, user)
+                return result
+    
+    @timed_operation("storage.modify_users")
+    def modify_users(self, usernames: Iterable[str], mutate: Callable[[User], T],
+                     batch_size: int = 500) -> Dict[str, T]:
+        """
+        Version groupée de modify_user pour les opérations de masse.
+        Les joueurs sont traités par lots de `batch_size` : un lot est relu,
+        modifié puis enregistré en une seule écriture (save_users). Les joueurs
+        en conflit de version sont relus et rejoués, au plus USER_WRITE_RETRIES
+        fois. Retourne username -> valeur renvoyée par `mutate` ; les joueurs
+        introuvables ou toujours en conflit sont absents du résultat.
+        """
+        usernames = list(dict.fromkeys(usernames))
+        results = {}
+        
+        for start in range(0, len(usernames), batch_size):
+            batch = usernames[start:start + batch_size]
+            
+            # Verrous de bande du lot, pris dans l'ordre pour éviter les interblocages
+            with contextlib.ExitStack() as stack:
+                for index in sorted({self._user_lock_index(username) for username in batch}):
+                    stack.enter_context(self._user_locks[index])
+                
+                pending = batch
+                for attempt in range(settings.USER_WRITE_RETRIES):
+                    updates, modified = [], {}
+                    for username in pending:
+                        user_data = self.storage.get_user(username)
+                        if user_data is None:
+                            continue
+                        
+                        user = User.from_dict(user_data)
+                        before = copy.deepcopy(user.to_dict())
+                        result = mutate(user)
+                        
+                        if user.to_dict() == before:
+                            results[username] = result
+                            continue
+                        
+                        updates.append((username, user.to_dict(), user_version(user_data)))
+                        modified[username] = (before, user, result)
+                    
+                    versions = self.storage.save_users(updates) if updates else {}
+                    for username, version in versions.items():
+                        before, user, result = modified[username]
+                        user.version = version
+                        for listener in self._save_listeners:
+                            listener(username, before, user)
+                        results[username] = result
+                    
+                    pending = [username for username in modified if username not in versions]
+                    if not pending:
+                        break
+                else:
+                    logger.warning("Modification groupée abandonnée pour %s joueur(s) en conflit: %s", len(pending), pending)
+        
+        return results
+    
+    @timed_operation("storage.user_exists")
     def user_exists(self, username: str) -> bool:
-        users = self.get_all_users()
-        return username in users
+        return self.storage.user_exists(username)
     
     # Quests
+    @timed_operation("storage.get_all_quests")
     def get_all_quests(self) -> List[Dict]:
-        return self._load_json(settings.QUESTS_DB_FILE) or []
+        return self.storage.get_all_quests()
     
+    @timed_operation("storage.get_quest")
     def get_quest(self, quest_id: int) -> Optional[Dict]:
-        quests = self.get_all_quests()
-        for quest in quests:
-            if quest.get("id") == quest_id:
-                return quest
-        return None
+        return self.storage.get_quest(quest_id)
     
+    @timed_operation("storage.save_quests")
     def save_quests(self, quests: List[Dict]):
-        self._save_json(settings.QUESTS_DB_FILE, quests)
+        self.storage.save_quests(quests)
     
+    @timed_operation("storage.add_quest")
     def add_quest(self, quest_data: Dict) -> Dict:
-        quests = self.get_all_quests()
-        quests.append(quest_data)
-        self.save_quests(quests)
-        return quest_data
+        return self.storage.add_quest(quest_data)
     
+    @timed_operation("storage.update_quest")
     def update_quest(self, quest_id: int, quest_data: Dict) -> Optional[Dict]:
-        quests = self.get_all_quests()
-        for i, quest in enumerate(quests):
-            if quest.get("id") == quest_id:
-                quests[i] = quest_data
-                self.save_quests(quests)
-                return quest_data
-        return None
+        return self.storage.update_quest(quest_id, quest_data)
     
+    @timed_operation("storage.delete_quest")
     def delete_quest(self, quest_id: int) -> bool:
-        quests = self.get_all_quests()
-        filtered = [q for q in quests if q.get("id") != quest_id]
-        if len(filtered) < len(quests):
-            self.save_quests(filtered)
-            return True
-        return False
+        return self.storage.delete_quest(quest_id)
+    
+    @timed_operation("storage.get_quests_version")
+    def get_quests_version(self) -> str:
+        return self.storage.get_quests_version()
     
+    @timed_operation("storage.get_next_quest_id")
     def get_next_quest_id(self) -> int:
-        quests = self.get_all_quests()
-        if not quests:
-            return 1
-        return max(q.get("id", 0) for q in quests) + 1
+        return self.storage.get_next_quest_id()
+    
+    @timed_operation("storage.create_quest")
+    def create_quest(self, quest_data: Dict) -> Dict:
+        return self.storage.create_quest(quest_data)
+
+class AsyncDatabase:
+    """
+    Façade asynchrone de Database pour les routes `async def`.
+    Chaque appel s'exécute dans un pool de threads borné : une écriture
+    lente ne bloque plus la boucle d'événements des autres requêtes.
+    """
+    
+    def __init__(self, database: Database, max_workers: int):
+        self.database = database
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="storage")
+    
+    async def run(self, func: Callable, *args, **kwargs):
+        """Exécute une opération synchrone (ex: une boucle sur tous les joueurs) dans le pool"""
+        loop = asyncio.get_running_loop()
+        # Le contexte suit l'appel dans le thread (durées rattachées à la requête en cours)
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self._executor, functools.partial(context.run, func, *args, **kwargs))
+    
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+    
+    # Users
+    async def get_all_users(self) -> Dict:
+        return await self.run(self.database.get_all_users)
+    
+    async def get_user(self, username: str) -> Optional[Dict]:
+        return await self.run(self.database.get_user, username)
+    
+    async def save_user(self, username: str, user_data: Dict, expected_version: Optional[int] = None) -> int:
+        return await self.run(self.database.save_user, username, user_data, expected_version)
+    
+    async def update_user(self, username: str, user_data: Dict, expected_version: Optional[int] = None) -> int:
+        return await self.run(self.database.update_user, username, user_data, expected_version)
+    
+    async def save_users(self, updates: List[Tuple[str, Dict, Optional[int]]]) -> Dict[str, int]:
+        return await self.run(self.database.save_users, updates)
+    
+    async def modify_users(self, usernames: Iterable[str], mutate: Callable[[User], T],
+                           batch_size: int = 500) -> Dict[str, T]:
+        return await self.run(self.database.modify_users, list(usernames), mutate, batch_size)
+    
+    async def modify_user(self, username: str, mutate: Callable[[User], T]) -> T:
+        return await self.run(self.database.modify_user, username, mutate)
+    
+    async def user_exists(self, username: str) -> bool:
+        return await self.run(self.database.user_exists, username)
+    
+    # Quests
+    async def get_all_quests(self) -> List[Dict]:
+        return await self.run(self.database.get_all_quests)
+    
+    async def get_quest(self, quest_id: int) -> Optional[Dict]:
+        return await self.run(self.database.get_quest, quest_id)
+    
+    async def save_quests(self, quests: List[Dict]):
+        await self.run(self.database.save_quests, quests)
+    
+    async def add_quest(self, quest_data: Dict) -> Dict:
+        return await self.run(self.database.add_quest, quest_data)
+    
+    async def update_quest(self, quest_id: int, quest_data: Dict) -> Optional[Dict]:
+        return await self.run(self.database.update_quest, quest_id, quest_data)
+    
+    async def delete_quest(self, quest_id: int) -> bool:
+        return await self.run(self.database.delete_quest, quest_id)
+    
+    async def get_quests_version(self) -> str:
+        return await self.run(self.database.get_quests_version)
+    
+    async def get_next_quest_id(self) -> int:
+        return await self.run(self.database.get_next_quest_id)
+    
+    async def create_quest(self, quest_data: Dict) -> Dict:
+        return await self.run(self.database.create_quest, quest_data)
 
-db = Database()
\ No newline at end of file
+db = Database()
+adb = AsyncDatabase(db, max_workers=settings.STORAGE_IO_WORKERS)
\ No newline at end of file
@@ -1,11 +1,12 @@
 from .quest_decorator import QuestDecorator
-from .requirements import LevelRequirementDecorator, NPCInteractionDecorator
+from .requirements import LevelRequirementDecorator, NPCInteractionDecorator, QuestRequirementDecorator
 from .rewards import MoneyRewardDecorator, ItemRewardDecorator
 
 __all__ = [
     'QuestDecorator',
     'LevelRequirementDecorator',
     'NPCInteractionDecorator',
+    'QuestRequirementDecorator',
     'MoneyRewardDecorator',
     'ItemRewardDecorator'
 ]
\ No newline at end of file
@@ -18,5 +18,8 @@ class QuestDecorator(IQuest):
     def can_start(self, player) -> bool:
         return self._quest.can_start(player)
     
+    def get_requirements(self) -> list:
+        return self._quest.get_requirements()
+    
     def complete(self, player) -> bool:
         return self._quest.complete(player)
\ No newline at end of file
@@ -1,6 +1,11 @@
 from app.decorators.quest_decorator import QuestDecorator
 from app.models.quest_interfaces import IQuest
 
+# Types de conditions utilisés dans les vecteurs de conditions (get_requirements)
+REQ_LEVEL = "level"
+REQ_NPC = "npc"
+REQ_QUEST = "quest"
+
 class LevelRequirementDecorator(QuestDecorator):
     """Ajoute une condition de niveau minimum (conservé)"""
     
@@ -11,14 +16,12 @@ class LevelRequirementDecorator(QuestDecorator):
     def get_description(self) -> str:
         return super().get_description() + f" [Requis: Niv {self.min_level}]"
     
+    def get_requirements(self) -> list:
+        return super().get_requirements() + [(REQ_LEVEL, self.min_level)]
+    
     def can_start(self, player) -> bool:
-        if self.is_completed(player):
-            return False
-        
-        if player.level >= self.min_level:
-            return super().can_start(player)
-        
-        return False
+        # La quête de base vérifie déjà is_completed, inutile de le refaire à chaque niveau
+        return player.level >= self.min_level and super().can_start(player)
 
 
 class NPCInteractionDecorator(QuestDecorator):
@@ -31,11 +34,25 @@ class NPCInteractionDecorator(QuestDecorator):
     def get_description(self) -> str:
         return super().get_description() + f" [Requis: Parler à {self.npc_name}]"
     
+    def get_requirements(self) -> list:
+        return super().get_requirements() + [(REQ_NPC, self.npc_name)]
+    
+    def can_start(self, player) -> bool:
+        return player.spoken_to_npc and super().can_start(player)
+
+
+class QuestRequirementDecorator(QuestDecorator):
+    """Ajoute une condition de quête préalable (chaînes de quêtes)"""
+    
+    def __init__(self, quest: IQuest, required_quest_id: int):
+        super().__init__(quest)
+        self.required_quest_id = required_quest_id
+    
+    def get_description(self) -> str:
+        return super().get_description() + f" [Requis: Quête #{self.required_quest_id}]"
+    
+    def get_requirements(self) -> list:
+        return super().get_requirements() + [(REQ_QUEST, self.required_quest_id)]
+    
     def can_start(self, player) -> bool:
-        if self.is_completed(player):
-            return False
-        
-        if player.spoken_to_npc:
-            return super().can_start(player)
-        
-        return False
\ No newline at end of file
+        return self.required_quest_id in player.completed_quests and super().can_start(player)
\ No newline at end of file
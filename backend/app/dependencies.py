@@ -1,16 +1,15 @@
-from fastapi import Depends, HTTPException, status
+from typing import Optional
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from app.auth.jwt_handler import decode_access_token
-from app.database import db
+from app.auth.jwt_handler import EVENTS_SCOPE, decode_access_token
+from app.database import adb
 from app.models.user import User
+from app.quests.quest_query import QuestQuery
 
 security = HTTPBearer()
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
-) -> User:
-    """Récupère l'utilisateur actuel depuis le token JWT"""
-    token = credentials.credentials
+async def _user_from_token(token: str, scope: Optional[str] = None) -> User:
+    """Charge le joueur désigné par un token JWT de la portée attendue (401 sinon)"""
     payload = decode_access_token(token)
     
     if payload is None:
@@ -19,6 +18,12 @@ async def get_current_user(
             detail="Token invalide ou expiré"
         )
     
+    if payload.get("scope") != scope:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token invalide pour cette ressource"
+        )
+    
     username = payload.get("sub")
     if username is None:
         raise HTTPException(
@@ -26,7 +31,7 @@ async def get_current_user(
             detail="Token invalide"
         )
     
-    user_data = db.get_user(username)
+    user_data = await adb.get_user(username)
     if user_data is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -35,6 +40,20 @@ async def get_current_user(
     
     return User.from_dict(user_data)
 
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> User:
+    """Récupère l'utilisateur actuel depuis le token JWT"""
+    return await _user_from_token(credentials.credentials)
+
+async def get_current_user_from_query(token: str = Query(...)) -> User:
+    """
+    Token court du flux d'événements passé en paramètre d'URL (?token=...),
+    pour EventSource qui ne permet pas d'envoyer d'en-tête Authorization.
+    Les tokens de connexion classiques sont refusés ici (et inversement).
+    """
+    return await _user_from_token(token, scope=EVENTS_SCOPE)
+
 async def get_current_admin(
     current_user: User = Depends(get_current_user)
 ) -> User:
@@ -44,4 +63,32 @@ async def get_current_admin(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Accès refusé. Droits administrateur requis."
         )
-    return current_user
\ No newline at end of file
+    return current_user
+
+def get_quest_query(
+    quest_type: Optional[str] = Query(None, alias="type"),
+    min_level: Optional[int] = Query(None, ge=0),
+    max_level: Optional[int] = Query(None, ge=0),
+    sort: str = "id",
+    order: str = "asc",
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=500)
+) -> QuestQuery:
+    """Filtres, tri et pagination communs aux listes de quêtes (400 si invalides)"""
+    query = QuestQuery(
+        type=quest_type,
+        min_level=min_level,
+        max_level=max_level,
+        sort=sort,
+        order=order,
+        cursor=cursor,
+        limit=limit
+    )
+    try:
+        query.validate()
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return query
\ No newline at end of file
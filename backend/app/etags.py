@@ -0,0 +1,52 @@
+"""
+ETags et requêtes conditionnelles (If-None-Match -> 304)
+
+Les validateurs sont dérivés des versions déjà tenues par le stockage
+(version du catalogue, version de chaque joueur) : une requête dont la
+réponse n'a pas changé est servie sans construire de modèle ni sérialiser.
+"""
+import hashlib
+from typing import Any, Dict, Optional
+from fastapi import Request, Response, status
+from app.metrics import cache_access
+
+# Les navigateurs revalident à chaque fois au lieu de resservir une réponse périmée
+CACHE_CONTROL = "private, no-cache"
+
+def make_etag(*parts: Any) -> str:
+    """ETag fort (entre guillemets) calculé à partir des versions qui déterminent la réponse"""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Vrai si l'en-tête If-None-Match contient l'ETag (ou *)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        # If-None-Match utilise la comparaison faible : W/"x" correspond à "x"
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == "*" or candidate == etag:
+            return True
+    return False
+
+def etag_headers(etag: str) -> Dict[str, str]:
+    """En-têtes de validation, pour une réponse construite directement"""
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+def set_etag(response: Response, etag: str):
+    response.headers.update(etag_headers(etag))
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """Réponse 304 si le client a déjà cette version, sinon None"""
+    matched = etag_matches(request, etag)
+    if "if-none-match" in request.headers:
+        cache_access("http_conditional", hit=matched)
+    if not matched:
+        return None
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers=etag_headers(etag)
+    )
\ No newline at end of file
@@ -0,0 +1,132 @@
+"""
+Instrumentation légère des chemins critiques
+
+- Timings : durées cumulées par opération (route, accès stockage, lecture /
+  écriture de fichier, construction du catalogue), consultables via
+  /admin/timings et résumées par requête dans l'en-tête Server-Timing
+- HotLoopLogger : journalisation structurée pour les boucles (une ligne par
+  quête, par joueur...) : rien n'est formaté si le niveau est désactivé, et
+  seul un appel sur `every` est émis
+"""
+import contextvars
+import functools
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+from app.metrics import storage_operation_duration
+
+class Timings:
+    """Nombre d'appels, durée totale et durée max par opération (thread-safe)"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        # nom -> [nombre, total (s), max (s)]
+        self._stats: Dict[str, list] = {}
+    
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                self._stats[name] = [1, seconds, seconds]
+            else:
+                stats[0] += 1
+                stats[1] += seconds
+                if seconds > stats[2]:
+                    stats[2] = seconds
+    
+    def snapshot(self) -> Dict[str, dict]:
+        """Statistiques par opération, en millisecondes"""
+        with self._lock:
+            items = [(name, list(stats)) for name, stats in self._stats.items()]
+        return {
+            name: {
+                "count": count,
+                "total_ms": round(total * 1000, 3),
+                "avg_ms": round(total * 1000 / count, 3),
+                "max_ms": round(maximum * 1000, 3)
+            }
+            for name, (count, total, maximum) in sorted(items)
+        }
+    
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+timings = Timings()
+
+# Durées de la requête en cours (nom -> secondes), pour l'en-tête Server-Timing
+request_timings: "contextvars.ContextVar[Optional[Dict[str, float]]]" = contextvars.ContextVar(
+    "request_timings", default=None
+)
+
+def record(name: str, seconds: float):
+    """Enregistre une durée globale et, si une requête est en cours, dans son détail"""
+    timings.record(name, seconds)
+    storage_operation_duration.observe(seconds, operation=name)
+    current = request_timings.get()
+    if current is not None:
+        current[name] = current.get(name, 0.0) + seconds
+
+@contextmanager
+def timed(name: str):
+    """Mesure le bloc : with timed("catalog.build"): ..."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+def timed_operation(name: str) -> Callable:
+    """Décorateur équivalent à `with timed(name)` autour de la fonction"""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+class _Fields:
+    """Champs key=value formatés seulement si la ligne est réellement écrite"""
+    
+    __slots__ = ("fields",)
+    
+    def __init__(self, fields: dict):
+        self.fields = fields
+    
+    def __str__(self) -> str:
+        return " ".join(f"{key}={value!r}" for key, value in self.fields.items())
+
+class HotLoopLogger:
+    """
+    Logger pour les boucles chaudes : logger.isEnabledFor() est testé avant
+    tout travail, puis seul un appel sur `every` est transmis (les champs sont
+    aussi passés en `extra` pour les handlers structurés)
+    """
+    
+    def __init__(self, logger: logging.Logger, every: int = 100):
+        self._logger = logger
+        self._every = max(1, every)
+        self._counter = itertools.count(1)
+    
+    def log(self, level: int, event: str, **fields):
+        if not self._logger.isEnabledFor(level):
+            return
+        if next(self._counter) % self._every:
+            return
+        self._logger.log(
+            level, "%s %s (1/%d)", event, _Fields(fields), self._every,
+            extra={"event": event, "fields": fields}
+        )
+    
+    def debug(self, event: str, **fields):
+        self.log(logging.DEBUG, event, **fields)
+    
+    def info(self, event: str, **fields):
+        self.log(logging.INFO, event, **fields)
\ No newline at end of file
@@ -1,7 +1,21 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from app.config import settings
+from app.database import adb
+from app.backends import VersionConflictError
 from app.routers import auth, player, admin
+from app.instrumentation import request_timings, timings
+from app.metrics import (
+    registry, http_requests, http_request_duration, http_requests_in_flight, monitor_event_loop
+)
+import asyncio
+import logging
+import secrets
+import time
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title=settings.APP_NAME,
@@ -16,13 +30,105 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],  # Pagination et requêtes conditionnelles
 )
 
+class SelectiveGZipMiddleware:
+    """
+    GZipMiddleware sauf pour les chemins exclus : Starlette < 0.28 compresse
+    aussi text/event-stream et garde les événements SSE en tampon
+    """
+    
+    def __init__(self, app, excluded_paths=(), **options):
+        self.app = app
+        self.gzip = GZipMiddleware(app, **options)
+        self.excluded_paths = frozenset(excluded_paths)
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in self.excluded_paths:
+            await self.app(scope, receive, send)
+        else:
+            await self.gzip(scope, receive, send)
+
+# Compression des réponses volumineuses (optionnelle), jamais pour le flux d'événements
+if settings.GZIP_ENABLED:
+    app.add_middleware(
+        SelectiveGZipMiddleware,
+        excluded_paths=["/player/events"],
+        minimum_size=settings.GZIP_MINIMUM_SIZE,
+    )
+
+@app.middleware("http")
+async def timing_middleware(request: Request, call_next):
+    """
+    Durée par route (gabarit, ex: GET /admin/quests/{quest_id}) : métriques
+    Prometheus, /admin/timings et détail dans l'en-tête Server-Timing
+    """
+    durations = {}
+    token = request_timings.set(durations)
+    http_requests_in_flight.inc()
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        elapsed = time.perf_counter() - start
+        http_requests_in_flight.dec()
+        request_timings.reset(token)
+        
+        # Gabarit de route (et non le chemin réel) pour borner le nombre de séries
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        timings.record(f"route:{request.method} {path}", elapsed)
+        http_request_duration.observe(elapsed, method=request.method, route=path)
+        http_requests.inc(method=request.method, route=path, status=status_code)
+    
+    if settings.SERVER_TIMING_HEADER:
+        entries = [f"app;dur={elapsed * 1000:.1f}"]
+        entries += [f"{op};dur={seconds * 1000:.1f}" for op, seconds in durations.items()]
+        response.headers["Server-Timing"] = ", ".join(entries)
+    
+    if elapsed * 1000 >= settings.SLOW_REQUEST_MS:
+        logger.warning(
+            "slow_request route=%r status=%d duration_ms=%.1f operations=%r",
+            f"{request.method} {path}", status_code, elapsed * 1000,
+            {op: round(seconds * 1000, 1) for op, seconds in durations.items()}
+        )
+    return response
+
 # Routes
 app.include_router(auth.router)
 app.include_router(player.router)
 app.include_router(admin.router)
 
+@app.exception_handler(VersionConflictError)
+async def version_conflict_handler(request: Request, exc: VersionConflictError):
+    """Écritures concurrentes sur le même joueur : le client peut réessayer"""
+    return JSONResponse(
+        status_code=status.HTTP_409_CONFLICT,
+        content={"detail": "Modification concurrente détectée, veuillez réessayer"}
+    )
+
+_background_tasks = []
+
+@app.on_event("startup")
+async def start_event_loop_monitor():
+    """Mesure du retard de la boucle asyncio (métrique event_loop_lag_seconds)"""
+    if settings.METRICS_ENABLED:
+        _background_tasks.append(asyncio.create_task(monitor_event_loop(settings.EVENT_LOOP_LAG_INTERVAL)))
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    for task in _background_tasks:
+        task.cancel()
+    _background_tasks.clear()
+
+@app.on_event("shutdown")
+def shutdown_storage():
+    """Attend la fin des écritures en cours avant l'arrêt"""
+    adb.shutdown()
+
 @app.get("/")
 async def root():
     """Endpoint racine"""
@@ -32,6 +138,16 @@ async def root():
         "docs": "/docs"
     }
 
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics(request: Request):
+        """Métriques au format texte Prometheus (registre en mémoire du processus)"""
+        if settings.METRICS_TOKEN:
+            expected = f"Bearer {settings.METRICS_TOKEN}"
+            if not secrets.compare_digest(request.headers.get("Authorization", ""), expected):
+                return PlainTextResponse("Unauthorized", status_code=status.HTTP_401_UNAUTHORIZED)
+        return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.get("/health")
 async def health_check():
     """Health check"""
@@ -0,0 +1,229 @@
+"""
+Métriques au format texte Prometheus (exposées sur /metrics)
+
+Registre en mémoire, propre au processus : aucune dépendance ni service
+externe. Compteurs, jauges et histogrammes avec labels, thread-safe
+(les accès disque et bcrypt tournent dans des pools de threads).
+"""
+import asyncio
+import math
+from abc import ABC, abstractmethod
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Latences HTTP / stockage (secondes)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# bcrypt est lent par conception : quelques centaines de ms
+PASSWORD_HASH_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+class Metric(ABC):
+    """Base : nom, aide, type et valeurs par combinaison de labels"""
+    
+    kind = "untyped"
+    
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], object] = {}
+    
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} : labels attendus {self.label_names}, reçus {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+    
+    def _labels(self, key: Tuple[str, ...], extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+        pairs = list(zip(self.label_names, key)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+    
+    @abstractmethod
+    def samples(self) -> List[str]:
+        """Lignes de valeurs au format texte (sans HELP / TYPE)"""
+        pass
+    
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"] + self.samples()
+
+class Counter(Metric):
+    kind = "counter"
+    
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+    
+    def items(self) -> List[Tuple[Tuple[str, ...], float]]:
+        """(valeurs des labels, total) pour chaque combinaison"""
+        with self._lock:
+            return list(self._values.items())
+    
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{self._labels(key)} {_format_value(value)}" for key, value in items]
+
+class Gauge(Metric):
+    """Valeur instantanée ; set_function() la calcule au moment de l'export"""
+    
+    kind = "gauge"
+    
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._function: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None
+    
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+    
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+    
+    def set_max(self, value: float, **labels):
+        """Ne garde que la plus grande valeur vue"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = max(self._values.get(key, value), value)
+    
+    def set_function(self, function: Callable[[], Dict[Tuple[str, ...], float]]):
+        """function() -> {valeurs des labels (tuple): valeur}"""
+        self._function = function
+    
+    def samples(self) -> List[str]:
+        if self._function is not None:
+            items = sorted(self._function().items())
+        else:
+            with self._lock:
+                items = sorted(self._values.items())
+        return [f"{self.name}{self._labels(key)} {_format_value(value)}" for key, value in items]
+
+class Histogram(Metric):
+    kind = "histogram"
+    
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+    
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            # [compte par bucket..., somme, nombre]
+            stats = self._values.get(key)
+            if stats is None:
+                stats = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    stats[index] += 1
+                    break
+            stats[-2] += value
+            stats[-1] += 1
+    
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(stats)) for key, stats in self._values.items())
+        lines = []
+        for key, stats in items:
+            cumulative = 0
+            for index, bound in enumerate(self.buckets):
+                cumulative += stats[index]
+                lines.append(f"{self.name}_bucket{self._labels(key, (('le', _format_value(bound)),))} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(key)} {_format_value(stats[-2])}")
+            lines.append(f"{self.name}_count{self._labels(key)} {stats[-1]}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[Metric] = []
+    
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+    
+    def render(self) -> str:
+        """Export au format texte Prometheus 0.0.4"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+# HTTP
+http_requests = registry.register(Counter(
+    "http_requests_total", "Requêtes HTTP traitées", ("method", "route", "status")))
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "Durée des requêtes HTTP par route", ("method", "route")))
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "Requêtes HTTP en cours de traitement"))
+
+# Stockage
+storage_operation_duration = registry.register(Histogram(
+    "storage_operation_duration_seconds", "Durée des opérations de stockage et du catalogue", ("operation",)))
+storage_bytes_read = registry.register(Counter(
+    "storage_bytes_read_total", "Octets lus par le stockage (fichiers, journal, SQLite)", ("source",)))
+storage_bytes_written = registry.register(Counter(
+    "storage_bytes_written_total", "Octets écrits par le stockage (fichiers, journal, SQLite)", ("source",)))
+
+# Caches (catalogue compilé, état des quêtes par joueur, requêtes conditionnelles)
+cache_requests = registry.register(Counter(
+    "cache_requests_total", "Accès aux caches", ("cache", "result")))
+cache_hit_ratio = registry.register(Gauge(
+    "cache_hit_ratio", "Part des accès servis par le cache depuis le démarrage", ("cache",)))
+
+def _hit_ratios() -> Dict[Tuple[str, ...], float]:
+    totals: Dict[str, List[float]] = {}
+    for (cache, result), count in cache_requests.items():
+        hits_total = totals.setdefault(cache, [0, 0])
+        hits_total[1] += count
+        if result == "hit":
+            hits_total[0] += count
+    return {(cache,): hits / total for cache, (hits, total) in totals.items() if total}
+
+cache_hit_ratio.set_function(_hit_ratios)
+
+# Mots de passe et boucle asyncio
+password_hash_duration = registry.register(Histogram(
+    "password_hash_duration_seconds", "Durée des calculs bcrypt", ("operation",), buckets=PASSWORD_HASH_BUCKETS))
+event_loop_lag = registry.register(Gauge(
+    "event_loop_lag_seconds", "Retard de la boucle asyncio lors de la dernière mesure"))
+event_loop_lag_max = registry.register(Gauge(
+    "event_loop_lag_max_seconds", "Plus grand retard de la boucle asyncio mesuré"))
+
+def cache_access(cache: str, hit: bool):
+    cache_requests.inc(cache=cache, result="hit" if hit else "miss")
+
+async def monitor_event_loop(interval: float = 0.5):
+    """
+    Mesure en continu le retard de la boucle : écart entre la durée de
+    sommeil demandée et le réveil effectif (tâche lancée au démarrage)
+    """
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lag = max(0.0, time.perf_counter() - start - interval)
+        event_loop_lag.set(lag)
+        event_loop_lag_max.set_max(lag)
\ No newline at end of file
@@ -1,4 +1,4 @@
-from .user import User
+from .user import User, UserRecord
 from .quest_interfaces import IQuest
 
-__all__ = ['User', 'IQuest']
\ No newline at end of file
+__all__ = ['User', 'UserRecord', 'IQuest']
\ No newline at end of file
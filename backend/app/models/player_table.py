@@ -0,0 +1,82 @@
+from typing import Dict, Iterable, List, Tuple
+import numpy as np
+from app.models.user import UserRecord
+
+class PlayerTable:
+    """
+    Joueurs en colonnes contiguës (un tableau NumPy par champ) pour les
+    statistiques et classements admin : les agrégats se calculent sur les
+    tableaux au lieu de parcourir des dictionnaires Python.
+    """
+    
+    SORT_KEYS = ("level", "xp", "money", "completed")
+    
+    def __init__(self, records: List[UserRecord]):
+        count = len(records)
+        self.usernames = [record.username for record in records]
+        self.is_admin = np.fromiter((r.is_admin for r in records), dtype=bool, count=count)
+        self.levels = np.fromiter((r.level for r in records), dtype=np.int32, count=count)
+        self.xp = np.fromiter((r.xp for r in records), dtype=np.int64, count=count)
+        self.money = np.fromiter((r.money for r in records), dtype=np.int64, count=count)
+        self.completed_counts = np.fromiter((r.completed_count for r in records), dtype=np.int32, count=count)
+    
+    @classmethod
+    def from_users(cls, users: Iterable[Tuple[str, Dict]]) -> "PlayerTable":
+        """Construit la table depuis un itérable (username, user_data), ex: db.iter_users()"""
+        return cls([UserRecord.from_dict(user_data) for _, user_data in users])
+    
+    def __len__(self) -> int:
+        return len(self.usernames)
+    
+    def stats(self, total_quests: int) -> dict:
+        """Statistiques globales (mêmes règles que l'ancien calcul : admins comptés seulement dans total_users)"""
+        players = np.flatnonzero(~self.is_admin)
+        completed = self.completed_counts[players]
+        
+        return {
+            "total_users": len(self),
+            "total_quests": total_quests,
+            "total_completed": int(completed.sum()),
+            # En cours = total de quêtes - quêtes complétées (jamais négatif)
+            "total_in_progress": int(np.maximum(total_quests - completed.astype(np.int64), 0).sum()),
+            "users": [
+                {
+                    "username": self.usernames[index],
+                    "level": int(self.levels[index]),
+                    "completed_quests": int(self.completed_counts[index])
+                }
+                for index in players.tolist()
+            ]
+        }
+    
+    def leaderboard(self, by: str = "level", limit: int = 10) -> List[dict]:
+        """
+        Meilleurs joueurs (hors admins) selon `by` : level (départage à l'XP),
+        xp, money ou completed
+        """
+        if by not in self.SORT_KEYS:
+            raise ValueError(f"Classement inconnu: {by} ({', '.join(self.SORT_KEYS)})")
+        
+        players = np.flatnonzero(~self.is_admin)
+        if by == "level":
+            keys = (self.xp[players], self.levels[players])
+        elif by == "xp":
+            keys = (self.xp[players],)
+        elif by == "money":
+            keys = (self.money[players],)
+        else:
+            keys = (self.completed_counts[players],)
+        
+        # lexsort : la dernière clé est la principale ; ordre décroissant
+        order = np.lexsort([-key.astype(np.int64) for key in keys])[:limit]
+        return [
+            {
+                "rank": rank,
+                "username": self.usernames[index],
+                "level": int(self.levels[index]),
+                "xp": int(self.xp[index]),
+                "money": int(self.money[index]),
+                "completed_quests": int(self.completed_counts[index])
+            }
+            for rank, index in enumerate(players[order].tolist(), start=1)
+        ]
\ No newline at end of file
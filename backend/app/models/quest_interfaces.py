@@ -23,6 +23,10 @@ class IQuest(ABC):
         """Vérifie si la quête a déjà été terminée"""
         pass
     
+    def get_requirements(self) -> list:
+        """Conditions de la quête à plat, sous forme de tuples (type, valeur)"""
+        return []
+    
     @abstractmethod
     def get_id(self) -> int:
         """Retourne l'ID unique de la quête"""
@@ -1,5 +1,264 @@
+import base64
+import threading
 from dataclasses import dataclass, field
-from typing import List
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
+
+class CompletedQuests(list):
+    """
+    Liste des IDs de quêtes complétées avec un index ensembliste :
+    `quest_id in completed` est en O(1) au lieu d'un parcours de liste.
+    
+    Reste une vraie liste (API, pydantic, JSON) ; sur disque elle est encodée
+    en bitset ("bits:" + base64, bit n = quête n complétée), sauf si la liste
+    d'IDs est plus courte (peu de quêtes aux IDs élevés). decode() accepte
+    les deux formats, les anciennes sauvegardes se lisent donc sans migration.
+    Dans les deux cas les IDs sont enregistrés triés et sans doublon.
+    Les IDs doivent être des entiers positifs ou nuls (ValueError sinon).
+    """
+    
+    PREFIX = "bits:"
+    
+    def __init__(self, quest_ids: Iterable[int] = ()):
+        super().__init__(quest_ids)
+        self._check(self)
+        self._ids = set(self)
+    
+    @staticmethod
+    def _check(quest_ids: Iterable[int]):
+        for quest_id in quest_ids:
+            if not isinstance(quest_id, int) or quest_id < 0:
+                raise ValueError(f"ID de quête invalide dans completed_quests: {quest_id!r}")
+    
+    @classmethod
+    def decode(cls, value: Union[str, Iterable[int], None]) -> "CompletedQuests":
+        """Construit depuis le format disque (bitset) ou une liste d'IDs"""
+        if isinstance(value, cls):
+            return value
+        if not isinstance(value, str):
+            return cls(value or ())
+        if not value.startswith(cls.PREFIX):
+            raise ValueError(f"Encodage de completed_quests invalide: {value[:20]}")
+        
+        bitset = base64.b64decode(value[len(cls.PREFIX):])
+        return cls(
+            index * 8 + bit
+            for index, byte in enumerate(bitset) if byte
+            for bit in range(8) if byte >> bit & 1
+        )
+    
+    @classmethod
+    def count_encoded(cls, value: Union[str, Iterable[int], None]) -> int:
+        """Nombre de quêtes complétées, sans construire la liste (bits à 1 du bitset)"""
+        if isinstance(value, str) and value.startswith(cls.PREFIX):
+            bitset = base64.b64decode(value[len(cls.PREFIX):])
+            return bin(int.from_bytes(bitset, "little")).count("1")
+        return len(cls.decode(value))
+    
+    def encode(self) -> Union[str, List[int]]:
+        """Encodage le plus compact pour le stockage : bitset, ou liste triée si elle est plus courte"""
+        bitset_size = max(self._ids) // 8 + 1 if self._ids else 0
+        # Tailles sérialisées : "bits:" + base64 contre "[1,2,...]"
+        encoded_size = len(self.PREFIX) + 2 + (bitset_size + 2) // 3 * 4
+        list_size = 2 + sum(len(str(quest_id)) + 1 for quest_id in self._ids)
+        if list_size < encoded_size:
+            return sorted(self._ids)
+        
+        bitset = bytearray(bitset_size)
+        for quest_id in self._ids:
+            bitset[quest_id // 8] |= 1 << (quest_id % 8)
+        return self.PREFIX + base64.b64encode(bytes(bitset)).decode('ascii')
+    
+    # Index maintenu à chaque modification de la liste
+    def __contains__(self, quest_id) -> bool:
+        return quest_id in self._ids
+    
+    def append(self, quest_id: int):
+        self._check((quest_id,))
+        super().append(quest_id)
+        self._ids.add(quest_id)
+    
+    def extend(self, quest_ids: Iterable[int]):
+        quest_ids = list(quest_ids)
+        self._check(quest_ids)
+        super().extend(quest_ids)
+        self._ids = set(self)
+    
+    def insert(self, index: int, quest_id: int):
+        self._check((quest_id,))
+        super().insert(index, quest_id)
+        self._ids.add(quest_id)
+    
+    def remove(self, quest_id: int):
+        super().remove(quest_id)
+        self._reindex()
+    
+    def pop(self, index: int = -1) -> int:
+        quest_id = super().pop(index)
+        self._reindex()
+        return quest_id
+    
+    def clear(self):
+        super().clear()
+        self._ids.clear()
+    
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            value = list(value)
+            self._check(value)
+        else:
+            self._check((value,))
+        super().__setitem__(index, value)
+        self._reindex()
+    
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._reindex()
+    
+    def __iadd__(self, quest_ids):
+        self.extend(quest_ids)
+        return self
+    
+    def __imul__(self, count):
+        super().__imul__(count)
+        self._reindex()
+        return self
+    
+    def __reduce__(self):
+        return (self.__class__, (list(self),))
+    
+    def _reindex(self):
+        self._ids = set(self)
+
+class ItemTable:
+    """
+    Table d'internement des noms d'objets : chaque nom distinct reçoit un ID
+    entier et n'est stocké qu'une fois en mémoire, quel que soit le nombre de
+    joueurs qui le possèdent. Les IDs sont propres au processus ; sur disque
+    les inventaires restent indexés par nom.
+    """
+    
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._lock = threading.Lock()
+    
+    def intern(self, name: str) -> int:
+        item_id = self._ids.get(name)
+        if item_id is None:
+            with self._lock:
+                item_id = self._ids.get(name)
+                if item_id is None:
+                    item_id = len(self._names)
+                    self._names.append(name)
+                    self._ids[name] = item_id
+        return item_id
+    
+    def lookup(self, name: str) -> int:
+        """ID d'un nom déjà interné, -1 sinon (n'ajoute rien à la table)"""
+        return self._ids.get(name, -1)
+    
+    def name(self, item_id: int) -> str:
+        return self._names[item_id]
+
+item_table = ItemTable()
+
+class Inventory:
+    """
+    Inventaire compté : ID d'objet interné -> quantité.
+    
+    Remplace la liste de noms (un nom répété à chaque récompense) tout en
+    gardant son API : append/extend, len, in, itération et to_list() donnent
+    la même chose que l'ancienne liste. Sur disque : {"nom": quantité}.
+    decode() accepte aussi l'ancien format liste.
+    """
+    
+    __slots__ = ("_counts",)
+    
+    def __init__(self, items: Union[Iterable[str], Dict[str, int]] = ()):
+        # Ordre d'insertion conservé : ordre de première obtention
+        self._counts: Dict[int, int] = {}
+        if isinstance(items, dict):
+            for name, count in items.items():
+                self.add(name, count)
+        else:
+            self.extend(items)
+    
+    @classmethod
+    def decode(cls, value: Union[Dict[str, int], Iterable[str], None]) -> "Inventory":
+        """Construit depuis le format disque (dict de quantités) ou une liste de noms"""
+        if isinstance(value, cls):
+            return value
+        return cls(value or ())
+    
+    def encode(self) -> Dict[str, int]:
+        """Format de stockage : nom -> quantité"""
+        return {item_table.name(item_id): count for item_id, count in self._counts.items()}
+    
+    def add(self, name: str, count: int = 1):
+        if count <= 0:
+            return
+        item_id = item_table.intern(name)
+        self._counts[item_id] = self._counts.get(item_id, 0) + count
+    
+    def remove(self, name: str, count: int = 1):
+        """Retire `count` exemplaires ; ValueError si le joueur n'en a pas assez"""
+        item_id = item_table.lookup(name)
+        held = self._counts.get(item_id, 0)
+        if held < count:
+            raise ValueError(f"Inventaire : {name} x{count} demandé, {held} disponible(s)")
+        if held == count:
+            del self._counts[item_id]
+        else:
+            self._counts[item_id] = held - count
+    
+    def append(self, name: str):
+        self.add(name)
+    
+    def extend(self, names: Iterable[str]):
+        for name in names:
+            self.add(name)
+    
+    def count(self, name: str) -> int:
+        return self._counts.get(item_table.lookup(name), 0)
+    
+    def items(self) -> Iterator[Tuple[str, int]]:
+        for item_id, count in self._counts.items():
+            yield item_table.name(item_id), count
+    
+    def to_list(self) -> List[str]:
+        """Ancien format : un nom par exemplaire"""
+        return list(self)
+    
+    def __contains__(self, name) -> bool:
+        return self.count(name) > 0
+    
+    def __len__(self) -> int:
+        return sum(self._counts.values())
+    
+    def __iter__(self) -> Iterator[str]:
+        for name, count in self.items():
+            for _ in range(count):
+                yield name
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Inventory):
+            return self._counts == other._counts
+        if isinstance(other, (list, tuple)):
+            return self._counts == Inventory(other)._counts
+        return NotImplemented
+    
+    def __reduce__(self):
+        return (self.__class__, (self.encode(),))
+    
+    def __repr__(self) -> str:
+        return f"Inventory({self.encode()})"
+    
+    @staticmethod
+    def size_encoded(value: Union[Dict[str, int], Iterable[str], None]) -> int:
+        """Nombre d'objets d'un inventaire stocké, sans le décoder"""
+        if isinstance(value, dict):
+            return sum(value.values())
+        return len(value or ())
 
 @dataclass
 class User:
@@ -13,9 +272,20 @@ class User:
     level: int = 1
     xp: int = 0
     money: int = 100
-    inventory: List[str] = field(default_factory=list)
+    inventory: Inventory = field(default_factory=Inventory)
     spoken_to_npc: bool = False
-    completed_quests: List[int] = field(default_factory=list)
+    completed_quests: List[int] = field(default_factory=CompletedQuests)
+    
+    # Version de l'enregistrement (incrémentée à chaque sauvegarde)
+    version: int = 0
+    
+    def __setattr__(self, name, value):
+        # Toute liste affectée à completed_quests (constructeur, routes admin...) est indexée
+        if name == "completed_quests":
+            value = CompletedQuests.decode(value)
+        elif name == "inventory":
+            value = Inventory.decode(value)
+        super().__setattr__(name, value)
     
     def to_dict(self) -> dict:
         """Convertit en dictionnaire pour sérialisation"""
@@ -27,9 +297,10 @@ class User:
             "level": self.level,
             "xp": self.xp,
             "money": self.money,
-            "inventory": self.inventory,
+            "inventory": self.inventory.encode(),
             "spoken_to_npc": self.spoken_to_npc,
-            "completed_quests": self.completed_quests
+            "completed_quests": self.completed_quests.encode(),
+            "version": self.version
         }
     
     @classmethod
@@ -38,17 +309,59 @@ class User:
         return cls(**data)
     
     def add_xp(self, amount: int) -> dict:
-        """Ajoute de l'XP et gère les level-ups"""
+        """
+        Ajoute de l'XP et gère les level-ups
+        
+        Calcul direct, sans boucle : atteindre le seuil (100 × niveau) fait
+        gagner un niveau et remet l'XP à zéro, sans report du surplus. C'est la
+        règle historique, un gain d'XP donne donc au plus un niveau.
+        """
         self.xp += amount
-        leveled_up = False
+        leveled_up = self.xp >= 100 * self.level
         
-        while self.xp >= 100 * self.level:
+        if leveled_up:
             self.level += 1
             self.xp = 0
-            leveled_up = True
         
         return {
             "xp_gained": amount,
             "leveled_up": leveled_up,
             "new_level": self.level if leveled_up else None
-        }
\ No newline at end of file
+        }
+
+class UserRecord:
+    """
+    Variante légère et en lecture seule de User pour les parcours d'analyse
+    (statistiques, classements) : __slots__ au lieu d'un __dict__ par instance,
+    et des compteurs au lieu de l'inventaire et des quêtes complétées.
+    """
+    
+    __slots__ = ("username", "is_admin", "name", "level", "xp", "money", "inventory_size", "completed_count")
+    
+    def __init__(self, username: str, is_admin: bool = False, name: str = "Héros", level: int = 1,
+                 xp: int = 0, money: int = 100, inventory_size: int = 0, completed_count: int = 0):
+        self.username = username
+        self.is_admin = is_admin
+        self.name = name
+        self.level = level
+        self.xp = xp
+        self.money = money
+        self.inventory_size = inventory_size
+        self.completed_count = completed_count
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "UserRecord":
+        """Crée l'enregistrement depuis les données stockées (formats liste ou compacts)"""
+        return cls(
+            username=data["username"],
+            is_admin=data.get("is_admin", False),
+            name=data.get("name", "Héros"),
+            level=data.get("level", 1),
+            xp=data.get("xp", 0),
+            money=data.get("money", 100),
+            inventory_size=Inventory.size_encoded(data.get("inventory")),
+            completed_count=CompletedQuests.count_encoded(data.get("completed_quests"))
+        )
+    
+    def __repr__(self) -> str:
+        return f"UserRecord({self.username!r}, level={self.level}, xp={self.xp}, money={self.money})"
\ No newline at end of file
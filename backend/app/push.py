@@ -0,0 +1,102 @@
+"""
+Diffusion d'événements vers les joueurs connectés (server-sent events)
+
+Chaque connexion ouverte n'est qu'une file asyncio : des milliers de clients
+inactifs ne coûtent ni thread ni requête. Un événement est mis au format SSE
+une seule fois puis déposé dans la file de chaque abonné.
+Le hub est propre à un worker : avec plusieurs workers, un client ne reçoit
+que les événements des écritures traitées par son worker (le reste apparaît
+au prochain rechargement, validé par ETag).
+"""
+import asyncio
+import threading
+from typing import Dict, Optional, Set
+from app import serialization
+from app.config import settings
+from app.metrics import Gauge, registry
+
+# Envoyé à la place des événements perdus quand un client ne suit pas
+RESYNC_MESSAGE = "event: resync\ndata: {}\n\n"
+
+def format_event(event: str, data: dict) -> str:
+    """Message SSE (une ligne data: en JSON compact)"""
+    return f"event: {event}\ndata: {serialization.dumps(data, 'compact').decode('utf-8')}\n\n"
+
+class EventHub:
+    """
+    Abonnements par joueur et diffusion des événements.
+    publish() / broadcast() peuvent être appelés depuis n'importe quel thread
+    (les sauvegardes se font dans le pool de threads du stockage) : la remise
+    dans les files se fait toujours sur la boucle asyncio.
+    """
+    
+    def __init__(self, queue_size: int = 64, max_connections: int = 10000):
+        self._queue_size = queue_size
+        self._max_connections = max_connections
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._connections = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def connections(self) -> int:
+        return self._connections
+    
+    def is_full(self) -> bool:
+        return self._connections >= self._max_connections
+    
+    def has_subscribers(self, username: str) -> bool:
+        """Permet de ne pas calculer d'événement pour un joueur non connecté"""
+        return username in self._subscribers
+    
+    def subscribe(self, username: str) -> asyncio.Queue:
+        """Ouvre une file pour une connexion (à appeler depuis la boucle asyncio)"""
+        self._loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=self._queue_size)
+        with self._lock:
+            self._subscribers.setdefault(username, set()).add(queue)
+            self._connections += 1
+        return queue
+    
+    def unsubscribe(self, username: str, queue: asyncio.Queue):
+        with self._lock:
+            queues = self._subscribers.get(username)
+            if queues is None or queue not in queues:
+                return
+            queues.discard(queue)
+            self._connections -= 1
+            if not queues:
+                del self._subscribers[username]
+    
+    def publish(self, username: str, event: str, data: dict):
+        """Envoie un événement à toutes les connexions d'un joueur"""
+        if self._loop is None or not self.has_subscribers(username):
+            return
+        self._loop.call_soon_threadsafe(self._deliver, format_event(event, data), username)
+    
+    def broadcast(self, event: str, data: dict):
+        """Envoie un événement à toutes les connexions (ex: catalogue modifié)"""
+        if self._loop is None or not self._subscribers:
+            return
+        self._loop.call_soon_threadsafe(self._deliver, format_event(event, data), None)
+    
+    def _deliver(self, message: str, username: Optional[str]):
+        with self._lock:
+            if username is None:
+                queues = [queue for subscribers in self._subscribers.values() for queue in subscribers]
+            else:
+                queues = list(self._subscribers.get(username, ()))
+        
+        for queue in queues:
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Client trop lent : on jette son retard et il se resynchronise
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC_MESSAGE)
+
+event_hub = EventHub(queue_size=settings.PUSH_QUEUE_SIZE, max_connections=settings.PUSH_MAX_CONNECTIONS)
+
+push_connections = registry.register(Gauge("push_connections", "Connexions /player/events ouvertes"))
+push_connections.set_function(lambda: {(): event_hub.connections})
\ No newline at end of file
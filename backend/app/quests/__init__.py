@@ -1,4 +1,5 @@
 from .base_quest import BaseQuest
 from .quest_factory import QuestFactory
+from .requirement_vector import RequirementVector
 
-__all__ = ['BaseQuest', 'QuestFactory']
\ No newline at end of file
+__all__ = ['BaseQuest', 'QuestFactory', 'RequirementVector']
\ No newline at end of file
@@ -0,0 +1,105 @@
+"""
+Calcul d'éligibilité vectorisé (NumPy)
+
+Le catalogue est stocké en colonnes (une case par quête) et les joueurs
+en colonnes (une case par joueur) : la disponibilité d'un joueur pour toutes
+les quêtes, ou de tous les joueurs pour une quête, se calcule en une passe.
+Les règles sont celles de RequirementVector (niveau minimum, PNJ, quêtes
+préalables, non complétée).
+"""
+from typing import Dict, Iterable, List, Tuple
+import numpy as np
+from app.models.user import CompletedQuests
+from app.quests.requirement_vector import RequirementVector
+
+class QuestColumns:
+    """Catalogue de quêtes en colonnes, dans l'ordre du catalogue"""
+    
+    def __init__(self, requirements: List[RequirementVector], quests_data: List[Dict]):
+        count = len(requirements)
+        self.ids = np.fromiter((r.quest_id for r in requirements), dtype=np.int64, count=count)
+        self.min_level = np.fromiter((r.min_level for r in requirements), dtype=np.int64, count=count)
+        self.needs_npc = np.fromiter((r.needs_npc for r in requirements), dtype=bool, count=count)
+        self.is_primary = np.fromiter((q["type"] == "PRIMARY" for q in quests_data), dtype=bool, count=count)
+        self.base_xp = np.fromiter((q["base_xp"] for q in quests_data), dtype=np.int64, count=count)
+        
+        # Prérequis à plat : une entrée (position de la quête, ID de la quête requise) par condition
+        prerequisites = [
+            (position, required_id)
+            for position, requirement in enumerate(requirements)
+            for required_id in requirement.required_quests
+        ]
+        self.prerequisite_positions = np.array([p for p, _ in prerequisites], dtype=np.int64)
+        self.prerequisite_ids = np.array([q for _, q in prerequisites], dtype=np.int64)
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def evaluate_player(self, player) -> Tuple[np.ndarray, np.ndarray]:
+        """Retourne les masques (is_completed, can_start) d'un joueur pour toutes les quêtes"""
+        completed_ids = np.fromiter(player.completed_quests, dtype=np.int64)
+        is_completed = np.isin(self.ids, completed_ids)
+        can_start = ~is_completed & (self.min_level <= player.level)
+        if not player.spoken_to_npc:
+            can_start &= ~self.needs_npc
+        if len(self.prerequisite_ids):
+            unmet = ~np.isin(self.prerequisite_ids, completed_ids)
+            can_start[self.prerequisite_positions[unmet]] = False
+        return is_completed, can_start
+
+class PlayerColumns:
+    """Joueurs en colonnes (niveau, PNJ, quêtes complétées)"""
+    
+    def __init__(self, usernames: List[str], levels: List[int], spoken_to_npc: List[bool],
+                 completed: List[CompletedQuests]):
+        self.usernames = usernames
+        self.levels = np.array(levels, dtype=np.int64)
+        self.spoken_to_npc = np.array(spoken_to_npc, dtype=bool)
+        
+        # Quêtes complétées à plat : une entrée (position du joueur, ID de la quête) par quête
+        completed_sets = [set(quests) for quests in completed]
+        self.completed_positions = np.repeat(
+            np.arange(len(completed_sets), dtype=np.int64),
+            [len(quests) for quests in completed_sets]
+        )
+        self.completed_ids = np.fromiter(
+            (quest_id for quests in completed_sets for quest_id in quests),
+            dtype=np.int64, count=len(self.completed_positions)
+        )
+    
+    @classmethod
+    def from_users(cls, users: Iterable[Tuple[str, Dict]], include_admins: bool = False) -> "PlayerColumns":
+        """Construit les colonnes depuis un itérable (username, user_data), ex: db.iter_users()"""
+        usernames, levels, spoken, completed = [], [], [], []
+        for username, user_data in users:
+            if user_data.get("is_admin", False) and not include_admins:
+                continue
+            usernames.append(username)
+            levels.append(user_data.get("level", 1))
+            spoken.append(user_data.get("spoken_to_npc", False))
+            completed.append(CompletedQuests.decode(user_data.get("completed_quests")))
+        return cls(usernames, levels, spoken, completed)
+    
+    def __len__(self) -> int:
+        return len(self.usernames)
+    
+    def can_start(self, requirements: RequirementVector) -> np.ndarray:
+        """Masque des joueurs pouvant commencer la quête"""
+        can_start = ~self.has_completed(requirements.quest_id) & (self.levels >= requirements.min_level)
+        if requirements.needs_npc:
+            can_start &= self.spoken_to_npc
+        if requirements.required_quests:
+            can_start &= self.has_completed_all(requirements.required_quests)
+        return can_start
+    
+    def has_completed(self, quest_id: int) -> np.ndarray:
+        """Masque des joueurs ayant complété la quête"""
+        return self.has_completed_all((quest_id,))
+    
+    def has_completed_all(self, quest_ids: Iterable[int]) -> np.ndarray:
+        """Masque des joueurs ayant complété toutes les quêtes données"""
+        required = np.unique(np.fromiter(quest_ids, dtype=np.int64))
+        matches = np.isin(self.completed_ids, required)
+        # Chaque joueur n'a qu'une entrée par quête : compter les correspondances suffit
+        counts = np.bincount(self.completed_positions[matches], minlength=len(self))
+        return counts == len(required)
\ No newline at end of file
@@ -0,0 +1,90 @@
+from typing import Dict, List
+from app.database import Database, db
+from app.models.user import User
+from app.push import EventHub, event_hub
+from app.quests.quest_catalog import QuestCatalog, quest_catalog
+
+# Champs du statut envoyés tels quels quand ils changent
+STATUS_FIELDS = ("name", "level", "xp", "money", "spoken_to_npc")
+
+class PlayerEventPublisher:
+    """
+    Transforme chaque sauvegarde d'un joueur connecté en petits événements :
+    - "player" : champs du statut modifiés, quêtes complétées ajoutées / retirées
+    - "quests" : quêtes complétées, débloquées ou reverrouillées par ce changement
+    Les modifications du catalogue sont diffusées à tous ("catalog").
+    """
+    
+    def __init__(self, hub: EventHub, catalog: QuestCatalog, database: Database):
+        self._hub = hub
+        self._catalog = catalog
+        database.add_save_listener(self._on_user_saved)
+    
+    def catalog_updated(self):
+        """À appeler après une modification du catalogue par un admin"""
+        self._hub.broadcast("catalog", {})
+    
+    def _on_user_saved(self, username: str, before: Dict, player: User):
+        # Rien à calculer si le joueur n'a pas de connexion ouverte
+        if not self._hub.has_subscribers(username):
+            return
+        
+        old = User.from_dict(before)
+        delta = self.player_delta(old, player)
+        if delta:
+            self._hub.publish(username, "player", delta)
+        
+        completed = delta.get("completed_quests_added", [])
+        unlocked, locked = self._quest_changes(old, player)
+        if completed or unlocked or locked:
+            self._hub.publish(username, "quests", {"completed": completed, "unlocked": unlocked, "locked": locked})
+    
+    @staticmethod
+    def player_delta(old: User, player: User) -> Dict:
+        """Différences de statut entre deux versions d'un joueur"""
+        delta = {
+            field: getattr(player, field)
+            for field in STATUS_FIELDS
+            if getattr(player, field) != getattr(old, field)
+        }
+        if player.inventory != old.inventory:
+            delta["inventory"] = player.inventory.to_list()
+            delta["inventory_counts"] = player.inventory.encode()
+        
+        added = [quest_id for quest_id in player.completed_quests if quest_id not in old.completed_quests]
+        removed = [quest_id for quest_id in old.completed_quests if quest_id not in player.completed_quests]
+        if added:
+            delta["completed_quests_added"] = added
+        if removed:
+            delta["completed_quests_removed"] = removed
+        return delta
+    
+    def _quest_changes(self, old: User, player: User):
+        """Quêtes dont la disponibilité a changé (seules celles touchées par l'événement sont évaluées)"""
+        snapshot = self._catalog.snapshot()
+        affected = set()
+        for quest_id in player.completed_quests:
+            if quest_id not in old.completed_quests:
+                affected.add(quest_id)
+                affected.update(snapshot.graph.successors(quest_id))
+        if player.spoken_to_npc != old.spoken_to_npc:
+            affected.update(snapshot.quests[p].data["id"] for p in snapshot.index.npc_positions())
+        if player.level != old.level:
+            low, high = sorted((old.level, player.level))
+            affected.update(snapshot.quests[p].data["id"] for p in snapshot.index.between_levels(low, high))
+        
+        unlocked: List[int] = []
+        locked: List[int] = []
+        for quest_id in sorted(affected):
+            compiled = snapshot.get(quest_id)
+            if compiled is None:
+                continue
+            was_available = compiled.requirements.evaluate(old)[0]
+            is_available = compiled.requirements.evaluate(player)[0]
+            if is_available and not was_available:
+                unlocked.append(quest_id)
+            elif was_available and not is_available and quest_id not in player.completed_quests:
+                locked.append(quest_id)
+        return unlocked, locked
+
+player_events = PlayerEventPublisher(event_hub, quest_catalog, db)
\ No newline at end of file
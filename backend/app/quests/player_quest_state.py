@@ -0,0 +1,134 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional, Set
+from app.config import settings
+from app.metrics import cache_access
+from app.database import Database, db
+from app.models.user import User, CompletedQuests
+from app.quests.quest_catalog import CatalogSnapshot, QuestCatalog, quest_catalog
+
+@dataclass
+class PlayerQuestState:
+    """Statut de chaque quête du catalogue pour un joueur, à une version donnée"""
+    catalog_version: str
+    user_version: int
+    completed: Set[int] = field(default_factory=set)
+    available: Set[int] = field(default_factory=set)
+    locked: Set[int] = field(default_factory=set)
+
+class PlayerQuestStates:
+    """
+    Cache des quêtes disponibles / terminées / verrouillées par joueur.
+    
+    Un état n'est valable que pour une version du catalogue et une version du
+    joueur ; sinon il est recalculé. Après chaque modify_user, seules les quêtes
+    touchées par l'événement sont réévaluées : quête terminée (et ses
+    successeurs), PNJ, passage de niveau. Les autres changements (quête retirée
+    par un admin...) font simplement recalculer l'état au prochain accès.
+    """
+    
+    def __init__(self, catalog: QuestCatalog, database: Database, max_players: int = 10000):
+        self._catalog = catalog
+        self._max_players = max_players
+        self._states: "OrderedDict[str, PlayerQuestState]" = OrderedDict()
+        self._lock = threading.Lock()
+        database.add_save_listener(self._on_user_saved)
+    
+    def get(self, player: User, snapshot: CatalogSnapshot) -> PlayerQuestState:
+        """État du joueur pour ce catalogue (calculé seulement si absent ou périmé)"""
+        with self._lock:
+            state = self._states.get(player.username)
+            if state and state.catalog_version == snapshot.version and state.user_version == player.version:
+                self._states.move_to_end(player.username)
+                cache_access("player_quest_state", hit=True)
+                return state
+        
+        cache_access("player_quest_state", hit=False)
+        state = self._compute(player, snapshot)
+        self._store(player.username, state)
+        return state
+    
+    def invalidate(self, username: Optional[str] = None):
+        """Oublie l'état d'un joueur, ou de tous (modification du catalogue par un admin)"""
+        with self._lock:
+            if username is None:
+                self._states.clear()
+            else:
+                self._states.pop(username, None)
+    
+    def _store(self, username: str, state: PlayerQuestState):
+        with self._lock:
+            self._states[username] = state
+            self._states.move_to_end(username)
+            while len(self._states) > self._max_players:
+                self._states.popitem(last=False)
+    
+    def _compute(self, player: User, snapshot: CatalogSnapshot) -> PlayerQuestState:
+        completed_mask, can_start_mask = snapshot.columns.evaluate_player(player)
+        ids = snapshot.columns.ids
+        state = PlayerQuestState(catalog_version=snapshot.version, user_version=player.version)
+        state.completed = set(ids[completed_mask].tolist())
+        state.available = set(ids[can_start_mask].tolist())
+        state.locked = set(ids.tolist()) - state.completed - state.available
+        return state
+    
+    def _on_user_saved(self, username: str, before: Dict, player: User):
+        """Met à jour l'état après une sauvegarde (appelé par Database.modify_user)"""
+        with self._lock:
+            state = self._states.get(username)
+        if state is None:
+            return
+        
+        snapshot = self._catalog.snapshot()
+        old_completed = CompletedQuests.decode(before.get("completed_quests"))
+        old_level = before.get("level", 1)
+        
+        if (state.catalog_version != snapshot.version
+                or state.user_version != before.get("version", 0)
+                or player.level < old_level
+                or any(quest_id not in player.completed_quests for quest_id in old_completed)):
+            self.invalidate(username)
+            return
+        
+        # Quêtes à réévaluer selon ce qui a changé
+        affected = set()
+        for quest_id in player.completed_quests:
+            if quest_id not in old_completed:
+                affected.add(quest_id)
+                affected.update(snapshot.graph.successors(quest_id))
+        if player.spoken_to_npc != before.get("spoken_to_npc", False):
+            affected.update(snapshot.quests[p].data["id"] for p in snapshot.index.npc_positions())
+        if player.level > old_level:
+            affected.update(snapshot.quests[p].data["id"] for p in snapshot.index.between_levels(old_level, player.level))
+        
+        # Copie : une requête peut être en train de lire l'ancien état
+        updated = PlayerQuestState(
+            catalog_version=state.catalog_version,
+            user_version=player.version,
+            completed=set(state.completed),
+            available=set(state.available),
+            locked=set(state.locked)
+        )
+        self._reevaluate(updated, player, snapshot, affected)
+        self._store(username, updated)
+    
+    def _reevaluate(self, state: PlayerQuestState, player: User, snapshot: CatalogSnapshot,
+                    quest_ids: Iterable[int]):
+        for quest_id in quest_ids:
+            compiled = snapshot.get(quest_id)
+            if compiled is None:
+                continue
+            
+            state.completed.discard(quest_id)
+            state.available.discard(quest_id)
+            state.locked.discard(quest_id)
+            
+            if quest_id in player.completed_quests:
+                state.completed.add(quest_id)
+            elif compiled.requirements.evaluate(player)[0]:
+                state.available.add(quest_id)
+            else:
+                state.locked.add(quest_id)
+
+player_quest_states = PlayerQuestStates(quest_catalog, db, max_players=settings.PLAYER_STATE_CACHE_SIZE)
\ No newline at end of file
@@ -0,0 +1,102 @@
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from app import serialization
+from app.database import Database, db
+from app.instrumentation import timed
+from app.metrics import cache_access
+from app.models.quest_interfaces import IQuest
+from app.quests.quest_factory import QuestFactory
+from app.quests.requirement_vector import RequirementVector
+from app.quests.eligibility import QuestColumns
+from app.quests.requirement_index import RequirementIndex
+from app.quests.quest_graph import QuestGraph
+from app.schemas.quest import QuestInDB
+
+@dataclass
+class CompiledQuest:
+    """Quête du catalogue : données brutes + objet décoré construit une seule fois"""
+    data: Dict
+    quest: IQuest
+    requirements: RequirementVector
+    _fragment: Optional[bytes] = field(default=None, repr=False)
+    
+    @property
+    def fragment(self) -> bytes:
+        """
+        JSON de la quête (forme QuestInDB), validé et sérialisé au premier
+        listage puis gardé pour la version : une quête invalide ne fait
+        échouer que les listes, pas la construction du catalogue
+        """
+        if self._fragment is None:
+            self._fragment = serialization.dumps(QuestInDB(**self.data).model_dump(), "compact")
+        return self._fragment
+
+@dataclass
+class CatalogSnapshot:
+    """Version figée du catalogue, partagée entre requêtes et joueurs (lecture seule)"""
+    version: Optional[str] = None
+    quests: List[CompiledQuest] = field(default_factory=list)
+    by_id: Dict[int, CompiledQuest] = field(default_factory=dict)
+    columns: Optional[QuestColumns] = None
+    index: Optional[RequirementIndex] = None
+    graph: Optional[QuestGraph] = None
+    
+    def get(self, quest_id: int) -> Optional[CompiledQuest]:
+        return self.by_id.get(quest_id)
+
+class QuestCatalog:
+    """
+    Cache des quêtes compilées (BaseQuest + chaîne de décorateurs).
+    Le catalogue n'est reconstruit que lorsque la version du stockage change
+    (modification par n'importe quel worker) ou après invalidate().
+    """
+    
+    def __init__(self, database: Database):
+        self._database = database
+        self._lock = threading.Lock()
+        self._snapshot = CatalogSnapshot()
+        self._stale = True
+    
+    def snapshot(self) -> CatalogSnapshot:
+        """Retourne le catalogue à jour (appel synchrone : lit le stockage si besoin)"""
+        version = self._database.get_quests_version()
+        snapshot = self._snapshot
+        if not self._stale and snapshot.version == version:
+            cache_access("quest_catalog", hit=True)
+            return snapshot
+        
+        with self._lock:
+            rebuild = self._stale or self._snapshot.version != version
+            cache_access("quest_catalog", hit=not rebuild)
+            if rebuild:
+                # La version est lue avant les données : au pire on reconstruira une fois de trop
+                self._stale = False
+                quests_data = self._database.get_all_quests()
+                with timed("catalog.build"):
+                    self._snapshot = self._build(version, quests_data)
+            return self._snapshot
+    
+    def invalidate(self):
+        """Force la reconstruction au prochain accès (appelé par les routes admin)"""
+        self._stale = True
+    
+    def _build(self, version: str, quests_data: List[Dict]) -> CatalogSnapshot:
+        snapshot = CatalogSnapshot(version=version)
+        for quest_data in quests_data:
+            quest = QuestFactory.create_quest_from_dict(quest_data)
+            compiled = CompiledQuest(
+                data=quest_data,
+                quest=quest,
+                requirements=QuestFactory.compile_requirements(quest)
+            )
+            snapshot.quests.append(compiled)
+            snapshot.by_id.setdefault(quest_data["id"], compiled)
+        
+        requirements = [compiled.requirements for compiled in snapshot.quests]
+        snapshot.columns = QuestColumns(requirements, [compiled.data for compiled in snapshot.quests])
+        snapshot.index = RequirementIndex(requirements)
+        snapshot.graph = QuestGraph(requirements)
+        return snapshot
+
+quest_catalog = QuestCatalog(db)
\ No newline at end of file
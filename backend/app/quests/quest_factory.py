@@ -1,8 +1,9 @@
 from typing import List, Dict
 from app.models.quest_interfaces import IQuest
 from app.quests.base_quest import BaseQuest
-from app.decorators.requirements import LevelRequirementDecorator, NPCInteractionDecorator
+from app.decorators.requirements import LevelRequirementDecorator, NPCInteractionDecorator, QuestRequirementDecorator
 from app.decorators.rewards import MoneyRewardDecorator, ItemRewardDecorator
+from app.quests.requirement_vector import RequirementVector
 
 class QuestFactory:
     """Factory pour créer des quêtes depuis le JSON"""
@@ -24,7 +25,7 @@ class QuestFactory:
         # ✅ FIX : Les quêtes SECONDARY doivent avoir une condition
         if q_data["type"] == "SECONDARY":
             has_requirement = any(
-                dec["type"] in ["level_req", "npc_req"] 
+                dec["type"] in ["level_req", "npc_req", "quest_req"] 
                 for dec in decorators
             )
             
@@ -43,6 +44,8 @@ class QuestFactory:
                 quest = LevelRequirementDecorator(quest, int(val))
             elif dtype == "npc_req":
                 quest = NPCInteractionDecorator(quest, str(val))
+            elif dtype == "quest_req":
+                quest = QuestRequirementDecorator(quest, int(val))
             elif dtype == "money_reward":
                 quest = MoneyRewardDecorator(quest, int(val))
             elif dtype == "item_reward":
@@ -50,6 +53,11 @@ class QuestFactory:
         
         return quest
     
+    @staticmethod
+    def compile_requirements(quest: IQuest) -> RequirementVector:
+        """Met à plat les conditions d'une quête décorée (à faire une fois par quête)"""
+        return RequirementVector(quest.get_id(), quest.get_requirements())
+    
     @staticmethod
     def load_all_quests_from_db(quests_data: List[Dict]) -> List[IQuest]:
         """Charge toutes les quêtes depuis une liste de dictionnaires"""
@@ -0,0 +1,58 @@
+from typing import Dict, Iterable, List, Optional
+from app.quests.requirement_vector import RequirementVector
+
+def prerequisite_ids(quest_data: Dict) -> List[int]:
+    """IDs des quêtes préalables (décorateurs quest_req) d'une quête brute"""
+    return [int(dec["value"]) for dec in quest_data.get("decorators", []) if dec["type"] == "quest_req"]
+
+class QuestGraph:
+    """
+    Graphe orienté des prérequis (arête A -> B : B nécessite A), calculé une fois
+    par version du catalogue. Après la complétion de A, seuls ses successeurs
+    directs peuvent avoir été débloqués.
+    """
+    
+    def __init__(self, requirements: Iterable[RequirementVector]):
+        self._successors: Dict[int, List[int]] = {}
+        for requirement in requirements:
+            for required_id in requirement.required_quests:
+                self._successors.setdefault(required_id, []).append(requirement.quest_id)
+    
+    def successors(self, quest_id: int) -> List[int]:
+        """Quêtes qui ont `quest_id` comme prérequis direct"""
+        return self._successors.get(quest_id, [])
+    
+    @staticmethod
+    def find_cycle(quests_data: List[Dict]) -> Optional[List[int]]:
+        """
+        Cherche un cycle de prérequis (parcours en profondeur itératif)
+        
+        Returns:
+            Le cycle sous forme d'IDs, le premier répété à la fin (ex: [1, 2, 1]), ou None
+        """
+        graph = {quest["id"]: prerequisite_ids(quest) for quest in quests_data}
+        in_progress, done = set(), set()
+        
+        for start in graph:
+            if start in done:
+                continue
+            
+            path = [start]
+            stack = [iter(graph[start])]
+            in_progress.add(start)
+            
+            while stack:
+                next_id = next(stack[-1], None)
+                if next_id is None:
+                    node = path.pop()
+                    stack.pop()
+                    in_progress.discard(node)
+                    done.add(node)
+                elif next_id in in_progress:
+                    return path[path.index(next_id):] + [next_id]
+                elif next_id in graph and next_id not in done:
+                    path.append(next_id)
+                    stack.append(iter(graph[next_id]))
+                    in_progress.add(next_id)
+        
+        return None
\ No newline at end of file
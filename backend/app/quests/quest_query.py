@@ -0,0 +1,117 @@
+"""
+Filtrage, tri et pagination par curseur des listes de quêtes
+
+Tout est évalué sur les colonnes du catalogue (positions dans le snapshot) :
+seules les quêtes de la page demandée sont ensuite transformées en modèles.
+Le curseur désigne la dernière quête renvoyée (valeur de tri + ID) et non un
+décalage : une quête ajoutée ou supprimée entre deux pages ne décale rien.
+"""
+import base64
+import json
+from dataclasses import dataclass
+from typing import Any, List, Optional, Tuple
+import numpy as np
+from app.quests.quest_catalog import CatalogSnapshot
+
+SORT_FIELDS = ("id", "level", "xp", "title")
+SORT_ORDERS = ("asc", "desc")
+QUEST_TYPES = ("PRIMARY", "SECONDARY")
+
+@dataclass
+class QuestQuery:
+    """Paramètres d'une liste de quêtes (None = pas de filtre / pas de pagination)"""
+    type: Optional[str] = None
+    completed: Optional[bool] = None
+    can_start: Optional[bool] = None
+    min_level: Optional[int] = None
+    max_level: Optional[int] = None
+    sort: str = "id"
+    order: str = "asc"
+    cursor: Optional[str] = None
+    limit: Optional[int] = None
+    
+    def validate(self):
+        """Lève ValueError si un paramètre est invalide"""
+        if self.type is not None and self.type not in QUEST_TYPES:
+            raise ValueError(f"Type de quête inconnu: {self.type} ({', '.join(QUEST_TYPES)})")
+        if self.sort not in SORT_FIELDS:
+            raise ValueError(f"Tri inconnu: {self.sort} ({', '.join(SORT_FIELDS)})")
+        if self.order not in SORT_ORDERS:
+            raise ValueError(f"Ordre inconnu: {self.order} ({', '.join(SORT_ORDERS)})")
+        if self.cursor is not None:
+            self.decode_cursor()
+    
+    def encode_cursor(self, key: Any, quest_id: int) -> str:
+        raw = json.dumps([self.sort, self.order, key, quest_id], separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+    
+    def decode_cursor(self) -> Tuple[Any, int]:
+        """Retourne (valeur de tri, ID) de la dernière quête de la page précédente"""
+        try:
+            padded = self.cursor + "=" * (-len(self.cursor) % 4)
+            sort, order, key, quest_id = json.loads(base64.urlsafe_b64decode(padded))
+        except (TypeError, ValueError):
+            raise ValueError("Curseur invalide")
+        if sort != self.sort or order != self.order:
+            raise ValueError("Curseur obtenu avec un autre tri")
+        if not isinstance(key, str if sort == "title" else int) or not isinstance(quest_id, int):
+            raise ValueError("Curseur invalide")
+        return key, quest_id
+
+@dataclass
+class QuestPage:
+    positions: List[int]
+    next_cursor: Optional[str] = None
+
+def select_quests(snapshot: CatalogSnapshot, query: QuestQuery, state=None,
+                  positions: Optional[List[int]] = None) -> QuestPage:
+    """
+    Positions (dans snapshot.quests) de la page demandée
+    
+    Args:
+        state: PlayerQuestState du joueur, nécessaire aux filtres completed / can_start
+        positions: Sous-ensemble de départ (ex: quêtes disponibles via l'index)
+    """
+    columns = snapshot.columns
+    mask = np.ones(len(columns), dtype=bool)
+    if positions is not None:
+        mask[:] = False
+        mask[positions] = True
+    
+    if query.type is not None:
+        mask &= columns.is_primary == (query.type == "PRIMARY")
+    if query.min_level is not None:
+        mask &= columns.min_level >= query.min_level
+    if query.max_level is not None:
+        mask &= columns.min_level <= query.max_level
+    if state is not None:
+        if query.completed is not None:
+            mask &= np.isin(columns.ids, list(state.completed)) == query.completed
+        if query.can_start is not None:
+            mask &= np.isin(columns.ids, list(state.available)) == query.can_start
+    
+    selected = np.flatnonzero(mask)
+    ids = columns.ids[selected].tolist()
+    if query.sort == "title":
+        keys = [snapshot.quests[p].data["title"].casefold() for p in selected.tolist()]
+    else:
+        column = {"id": columns.ids, "level": columns.min_level, "xp": columns.base_xp}[query.sort]
+        keys = column[selected].tolist()
+    
+    # Ordre (valeur, ID) : l'ID départage les égalités et rend le curseur stable
+    order = sorted(range(len(keys)), key=lambda i: (keys[i], ids[i]), reverse=query.order == "desc")
+    
+    if query.cursor is not None:
+        last = query.decode_cursor()
+        if query.order == "asc":
+            order = [i for i in order if (keys[i], ids[i]) > last]
+        else:
+            order = [i for i in order if (keys[i], ids[i]) < last]
+    
+    next_cursor = None
+    if query.limit is not None and len(order) > query.limit:
+        order = order[:query.limit]
+        last = order[-1]
+        next_cursor = query.encode_cursor(keys[last], ids[last])
+    
+    return QuestPage(positions=[int(selected[i]) for i in order], next_cursor=next_cursor)
\ No newline at end of file
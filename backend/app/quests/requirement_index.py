@@ -0,0 +1,54 @@
+from bisect import bisect_right
+from typing import List
+from app.quests.requirement_vector import RequirementVector
+
+class RequirementIndex:
+    """
+    Index des quêtes par niveau requis, séparé selon la condition PNJ.
+    Les quêtes accessibles à un joueur de niveau L sont un préfixe de chaque
+    liste triée : une recherche par plage au lieu d'un parcours du catalogue.
+    """
+    
+    def __init__(self, requirements: List[RequirementVector]):
+        # needs_npc -> (niveaux triés, positions dans le catalogue)
+        self._buckets = {}
+        for needs_npc in (False, True):
+            entries = sorted(
+                (requirement.min_level, position)
+                for position, requirement in enumerate(requirements)
+                if requirement.needs_npc == needs_npc
+            )
+            self._buckets[needs_npc] = (
+                [level for level, _ in entries],
+                [position for _, position in entries]
+            )
+        self._requirements = requirements
+    
+    def candidates(self, level: int, spoken_to_npc: bool) -> List[int]:
+        """Positions (ordre du catalogue) des quêtes dont les conditions sont remplies"""
+        positions = []
+        for needs_npc in ((False, True) if spoken_to_npc else (False,)):
+            levels, bucket_positions = self._buckets[needs_npc]
+            positions.extend(bucket_positions[:bisect_right(levels, level)])
+        positions.sort()
+        return positions
+    
+    def between_levels(self, low: int, high: int) -> List[int]:
+        """Positions des quêtes dont le niveau requis est dans ]low, high] (passage de niveau)"""
+        positions = []
+        for levels, bucket_positions in self._buckets.values():
+            positions.extend(bucket_positions[bisect_right(levels, low):bisect_right(levels, high)])
+        return positions
+    
+    def npc_positions(self) -> List[int]:
+        """Positions des quêtes qui demandent d'avoir parlé au PNJ"""
+        return self._buckets[True][1]
+    
+    def available(self, player) -> List[int]:
+        """Positions des quêtes que le joueur peut commencer (non complétées)"""
+        return [
+            position
+            for position in self.candidates(player.level, player.spoken_to_npc)
+            if self._requirements[position].quest_id not in player.completed_quests
+            and self._requirements[position].prerequisites_met(player)
+        ]
\ No newline at end of file
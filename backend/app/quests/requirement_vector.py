@@ -0,0 +1,54 @@
+from typing import List, Tuple
+from app.decorators.requirements import REQ_LEVEL, REQ_NPC, REQ_QUEST
+
+class RequirementVector:
+    """
+    Conditions d'une quête mises à plat par QuestFactory.
+    Une seule passe donne à la fois can_start et les conditions manquantes,
+    sans parcourir la chaîne de décorateurs.
+    """
+    
+    __slots__ = ("quest_id", "entries", "min_level", "needs_npc", "required_quests")
+    
+    def __init__(self, quest_id: int, entries: List[Tuple[str, any]]):
+        self.quest_id = quest_id
+        self.entries = tuple(entries)
+        # Résumé utilisé par les évaluations groupées
+        self.min_level = max((value for kind, value in self.entries if kind == REQ_LEVEL), default=0)
+        self.needs_npc = any(kind == REQ_NPC for kind, _ in self.entries)
+        self.required_quests = tuple(value for kind, value in self.entries if kind == REQ_QUEST)
+    
+    def evaluate(self, player, detailed: bool = False) -> Tuple[bool, List[str]]:
+        """
+        Retourne (can_start, raisons). Une quête déjà complétée ne peut pas
+        être commencée mais n'a pas de condition manquante.
+        
+        Args:
+            detailed: Messages destinés au retour de /complete (niveau actuel, etc.)
+        """
+        if self.quest_id in player.completed_quests:
+            return False, []
+        
+        reasons = []
+        for kind, value in self.entries:
+            if kind == REQ_LEVEL:
+                if player.level < value:
+                    reasons.append(
+                        f"Niveau {value} requis (actuel: {player.level})" if detailed
+                        else f"Niveau {value} requis"
+                    )
+            elif kind == REQ_NPC:
+                if not player.spoken_to_npc:
+                    reasons.append("Vous devez d'abord parler au PNJ" if detailed else "Parler au PNJ requis")
+            elif kind == REQ_QUEST:
+                if value not in player.completed_quests:
+                    reasons.append(
+                        f"Vous devez d'abord terminer la quête #{value}" if detailed
+                        else f"Quête #{value} requise"
+                    )
+        
+        return not reasons, reasons
+    
+    def prerequisites_met(self, player) -> bool:
+        """Vrai si toutes les quêtes préalables sont complétées"""
+        return all(quest_id in player.completed_quests for quest_id in self.required_quests)
\ No newline at end of file
@@ -0,0 +1,33 @@
+"""
+Réponses JSON rapides pour les routes volumineuses
+
+- FastJSONResponse : sérialise avec serialization.dumps (orjson si installé)
+  sans repasser par la validation Pydantic du response_model
+- json_array : assemble des fragments JSON déjà sérialisés (ex: une quête
+  mise en cache par version du catalogue) en une seule liste
+"""
+from typing import Any, Iterable, Mapping, Optional
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from app import serialization
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return serialization.dumps(content, "compact")
+
+class RawJSONResponse(Response):
+    """Corps JSON déjà sérialisé (bytes)"""
+    media_type = "application/json"
+
+def json_array(fragments: Iterable[bytes], headers: Optional[Mapping[str, str]] = None) -> RawJSONResponse:
+    """Liste JSON à partir d'éléments déjà sérialisés"""
+    return RawJSONResponse(content=b"[" + b",".join(fragments) + b"]", headers=headers)
+
+def extend_object(fragment: bytes, fields: dict) -> bytes:
+    """Ajoute des champs à la fin d'un objet JSON déjà sérialisé ({...} -> {..., fields})"""
+    if not fields:
+        return fragment
+    extra = serialization.dumps(fields, "compact")
+    if fragment == b"{}":
+        return extra
+    return fragment[:-1] + b"," + extra[1:]
\ No newline at end of file
@@ -1,9 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
-from app.dependencies import get_current_admin
-from app.models.user import User
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from typing import List, Optional, Set
+from app.dependencies import get_current_admin, get_quest_query
+from app.models.user import User, CompletedQuests
+from app.models.player_table import PlayerTable
 from app.schemas.quest import QuestCreate, QuestUpdate, QuestInDB
-from app.database import db
+from app.schemas.admin import RewardGrant, RewardGrantResult
+from app.database import db, adb
+from app.etags import etag_headers, make_etag, not_modified
+from app.quests.quest_catalog import quest_catalog
+from app.quests.quest_query import QuestQuery, select_quests
+from app.responses import FastJSONResponse, json_array
+from app.instrumentation import timings
+from app.quests.player_quest_state import player_quest_states
+from app.quests.player_events import player_events
+from app.quests.eligibility import PlayerColumns
+from app.quests.quest_graph import QuestGraph, prerequisite_ids
 import logging
 
 # ✅ Ajouter du logging pour debug
@@ -11,10 +22,35 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
+def _invalidate_quest_caches():
+    """À appeler après toute modification du catalogue"""
+    quest_catalog.invalidate()
+    player_quest_states.invalidate()
+    player_events.catalog_updated()
+
 @router.get("/quests", response_model=List[QuestInDB])
-async def list_all_quests(current_user: User = Depends(get_current_admin)):
-    """Liste toutes les quêtes (admin)"""
-    return db.get_all_quests()
+async def list_all_quests(
+    request: Request,
+    query: QuestQuery = Depends(get_quest_query),
+    current_user: User = Depends(get_current_admin)
+):
+    """
+    Liste les quêtes (admin), avec filtres (type, min_level, max_level), tri
+    (sort, order) et pagination (limit, cursor, en-tête X-Next-Cursor).
+    304 si le catalogue n'a pas changé.
+    """
+    cached = not_modified(request, make_etag("admin-quests", await adb.get_quests_version(), request.url.query))
+    if cached:
+        return cached
+    
+    catalog = await adb.run(quest_catalog.snapshot)
+    headers = etag_headers(make_etag("admin-quests", catalog.version, request.url.query))
+    page = select_quests(catalog, query)
+    if page.next_cursor:
+        headers["X-Next-Cursor"] = page.next_cursor
+    
+    # JSON de chaque quête déjà sérialisé dans le catalogue
+    return json_array((catalog.quests[position].fragment for position in page.positions), headers)
 
 @router.post("/quests", response_model=QuestInDB, status_code=status.HTTP_201_CREATED)
 async def create_quest(
@@ -24,10 +60,6 @@ async def create_quest(
     """Crée une nouvelle quête"""
     
     try:
-        # Générer un nouvel ID
-        new_id = db.get_next_quest_id()
-        logger.info(f"Creating quest with ID: {new_id}")
-        
         # ✅ Convertir en dict avec mode='json' pour forcer la sérialisation
         quest_dict_raw = quest_data.model_dump(mode='json')
         logger.info(f"Quest data after dump: {quest_dict_raw}")
@@ -53,9 +85,8 @@ async def create_quest(
         
         logger.info(f"Final decorators: {decorators}")
         
-        # Créer la quête avec structure propre
+        # Créer la quête avec structure propre (l'ID est attribué à l'enregistrement)
         quest_dict = {
-            "id": new_id,
             "title": str(quest_dict_raw["title"]),
             "description": str(quest_dict_raw["description"]),
             "base_xp": int(quest_dict_raw["base_xp"]),
@@ -65,12 +96,18 @@ async def create_quest(
         
         logger.info(f"Final quest dict before save: {quest_dict}")
         
-        # Sauvegarder
-        db.add_quest(quest_dict)
-        logger.info("Quest saved successfully")
+        # L'ID définitif n'est connu qu'à l'enregistrement : on vérifie avec le prochain ID
+        await _check_prerequisites(dict(quest_dict, id=await adb.get_next_quest_id()))
+        
+        # Sauvegarder : ID réservé et quête ajoutée en une seule opération
+        quest_dict = await adb.create_quest(quest_dict)
+        _invalidate_quest_caches()
+        logger.info(f"Quest saved successfully with ID: {quest_dict['id']}")
         
         return quest_dict
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error creating quest: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -78,6 +115,34 @@ async def create_quest(
             detail=f"Erreur lors de la création: {str(e)}"
         )
 
+async def _check_prerequisites(quest_dict: dict):
+    """Refuse les quêtes préalables inconnues et les cycles de prérequis (400)"""
+    try:
+        required_ids = prerequisite_ids(quest_dict)
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La valeur d'un prérequis de quête doit être un ID de quête"
+        )
+    if not required_ids:
+        return
+    
+    quests = await adb.get_all_quests()
+    known_ids = {q["id"] for q in quests}
+    missing = [qid for qid in required_ids if qid not in known_ids]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Quête(s) prérequise(s) introuvable(s): {', '.join(f'#{qid}' for qid in missing)}"
+        )
+    
+    cycle = QuestGraph.find_cycle([q for q in quests if q["id"] != quest_dict["id"]] + [quest_dict])
+    if cycle:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cycle de prérequis détecté: {' → '.join(f'#{qid}' for qid in cycle)}"
+        )
+
 @router.put("/quests/{quest_id}", response_model=QuestInDB)
 async def update_quest(
     quest_id: int,
@@ -88,7 +153,7 @@ async def update_quest(
     
     try:
         # Vérifier que la quête existe
-        existing = db.get_quest(quest_id)
+        existing = await adb.get_quest(quest_id)
         if existing is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -126,7 +191,10 @@ async def update_quest(
         
         logger.info(f"Final update dict: {updated_quest}")
         
-        db.update_quest(quest_id, updated_quest)
+        await _check_prerequisites(updated_quest)
+        
+        await adb.update_quest(quest_id, updated_quest)
+        _invalidate_quest_caches()
         logger.info("Quest updated successfully")
         
         return updated_quest
@@ -145,10 +213,21 @@ async def delete_quest(
     quest_id: int,
     current_user: User = Depends(get_current_admin)
 ):
-    """Supprime une quête"""
+    """Supprime une quête (409 si d'autres quêtes l'ont comme prérequis)"""
+    
+    dependents = [q["id"] for q in await adb.get_all_quests() if quest_id in prerequisite_ids(q)]
+    if dependents:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=(
+                f"Quête #{quest_id} requise par {', '.join(f'#{qid}' for qid in dependents)} : "
+                "retirez d'abord ce prérequis"
+            )
+        )
     
     # ✅ FIX : Nettoyer l'ID de toutes les listes completed_quests
-    success = db.delete_quest(quest_id)
+    success = await adb.delete_quest(quest_id)
+    _invalidate_quest_caches()
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -156,18 +235,48 @@ async def delete_quest(
         )
     
     # ✅ NOUVEAU : Retirer cet ID de tous les joueurs
-    users = db.get_all_users()
-    for username, user_data in users.items():
-        if quest_id in user_data.get("completed_quests", []):
-            user_data["completed_quests"].remove(quest_id)
-            db.update_user(username, user_data)
-            logger.info(f"Removed quest {quest_id} from user {username}'s completed list")
+    # (les parcours de tous les joueurs s'exécutent dans le pool de stockage)
+    await adb.run(_remove_quest_from_players, quest_id)
+
+def _remove_quest_from_players(quest_id: int):
+    """Retire une quête supprimée des completed_quests de chaque joueur"""
+    def remove(player: User):
+        if quest_id in player.completed_quests:
+            player.completed_quests.remove(quest_id)
+    
+    for username, user_data in db.iter_users():
+        if quest_id in CompletedQuests.decode(user_data.get("completed_quests")):
+            db.modify_user(username, remove)
+            logger.info("Removed quest %s from user %s's completed list", quest_id, username)
+
+@router.get("/quests/{quest_id}/eligible-players", response_model=dict)
+async def count_eligible_players(quest_id: int, current_user: User = Depends(get_current_admin)):
+    """Nombre de joueurs pouvant commencer une quête en ce moment"""
+    return await adb.run(_count_eligible_players, quest_id)
+
+def _count_eligible_players(quest_id: int) -> dict:
+    """Évalue une quête pour tous les joueurs (hors admins) en une passe vectorisée"""
+    compiled = quest_catalog.snapshot().get(quest_id)
+    if compiled is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Quête #{quest_id} introuvable"
+        )
+    
+    players = PlayerColumns.from_users(db.iter_users())
+    eligible = players.can_start(compiled.requirements)
+    
+    return {
+        "quest_id": quest_id,
+        "eligible_players": int(eligible.sum()),
+        "total_players": len(players)
+    }
 
 @router.post("/quests/fix-ids", response_model=dict)
 async def fix_quest_ids(current_user: User = Depends(get_current_admin)):
     """Réattribue des IDs séquentiels à toutes les quêtes"""
     
-    quests = db.get_all_quests()
+    quests = await adb.get_all_quests()
     
     # ✅ AMÉLIORATION : Mapper les anciens IDs vers les nouveaux
     id_mapping = {}
@@ -177,22 +286,31 @@ async def fix_quest_ids(current_user: User = Depends(get_current_admin)):
         id_mapping[old_id] = new_id
         quest["id"] = new_id
     
-    db.save_quests(quests)
+    # Les prérequis suivent la renumérotation (ceux vers une quête inconnue sont retirés)
+    for quest in quests:
+        decorators = []
+        for dec in quest.get("decorators", []):
+            if dec["type"] == "quest_req":
+                if int(dec["value"]) not in id_mapping:
+                    logger.warning("Removed unknown prerequisite #%s from quest #%s", dec["value"], quest["id"])
+                    continue
+                dec = dict(dec, value=id_mapping[int(dec["value"])])
+            decorators.append(dec)
+        quest["decorators"] = decorators
+    
+    # Des IDs en double rendent certains prérequis ambigus : rien n'est enregistré en cas de cycle
+    cycle = QuestGraph.find_cycle(quests)
+    if cycle:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"La renumérotation créerait un cycle de prérequis: {' → '.join(f'#{qid}' for qid in cycle)}"
+        )
+    
+    await adb.save_quests(quests)
+    _invalidate_quest_caches()
     
     # ✅ NOUVEAU : Mettre à jour les IDs dans les completed_quests de tous les joueurs
-    users = db.get_all_users()
-    for username, user_data in users.items():
-        old_completed = user_data.get("completed_quests", [])
-        new_completed = []
-        
-        for old_quest_id in old_completed:
-            if old_quest_id in id_mapping:
-                new_completed.append(id_mapping[old_quest_id])
-            # Si l'ancien ID n'existe plus dans les quêtes, on le supprime
-        
-        user_data["completed_quests"] = new_completed
-        db.update_user(username, user_data)
-        logger.info(f"Updated completed_quests for user {username}: {old_completed} -> {new_completed}")
+    await adb.run(_remap_players_quest_ids, id_mapping)
     
     return {
         "success": True,
@@ -200,45 +318,103 @@ async def fix_quest_ids(current_user: User = Depends(get_current_admin)):
         "id_mapping": id_mapping
     }
 
+def _remap_players_quest_ids(id_mapping: dict):
+    """Applique la renumérotation aux completed_quests de chaque joueur"""
+    def remap(player: User) -> list:
+        # Si l'ancien ID n'existe plus dans les quêtes, on le supprime
+        player.completed_quests = [
+            id_mapping[old_quest_id]
+            for old_quest_id in player.completed_quests
+            if old_quest_id in id_mapping
+        ]
+        return player.completed_quests
+    
+    for username, user_data in db.iter_users():
+        old_completed = CompletedQuests.decode(user_data.get("completed_quests"))
+        new_completed = db.modify_user(username, remap)
+        logger.info("Updated completed_quests for user %s: %s -> %s", username, old_completed, new_completed)
+
 @router.get("/stats", response_model=dict)
 async def get_stats(current_user: User = Depends(get_current_admin)):
     """Statistiques globales avec quêtes terminées et en cours"""
+    # Liste potentiellement longue (un élément par joueur) : sérialisation directe
+    return FastJSONResponse(await adb.run(_compute_stats))
+
+def _compute_stats() -> dict:
+    """Calcule les statistiques sur la table en colonnes de tous les joueurs"""
+    total_quests = len(db.get_all_quests())
+    return PlayerTable.from_users(db.iter_users()).stats(total_quests)
+
+@router.get("/leaderboard", response_model=List[dict])
+async def get_leaderboard(
+    by: str = "level",
+    limit: int = Query(10, ge=1, le=1000),
+    current_user: User = Depends(get_current_admin)
+):
+    """Classement des joueurs (by : level, xp, money ou completed)"""
+    if by not in PlayerTable.SORT_KEYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Classement inconnu: {by} ({', '.join(PlayerTable.SORT_KEYS)})"
+        )
+    return await adb.run(_compute_leaderboard, by, limit)
+
+def _compute_leaderboard(by: str, limit: int) -> List[dict]:
+    return PlayerTable.from_users(db.iter_users()).leaderboard(by, limit)
+
+@router.get("/timings", response_model=dict)
+async def get_timings(reset: bool = False, current_user: User = Depends(get_current_admin)):
+    """Durées cumulées par route et par opération de stockage (reset=true : remet à zéro)"""
+    snapshot = timings.snapshot()
+    if reset:
+        timings.reset()
+    return snapshot
+
+@router.post("/rewards/grant", response_model=RewardGrantResult)
+async def grant_rewards(grant: RewardGrant, current_user: User = Depends(get_current_admin)):
+    """Distribue XP, argent et objets à tous les joueurs correspondant aux filtres"""
+    return await adb.run(_grant_rewards, grant)
+
+def _grant_matches(grant: RewardGrant, usernames: Optional[Set[str]], player: User) -> bool:
+    if player.is_admin:
+        return False
+    if usernames is not None and player.username not in usernames:
+        return False
+    if grant.min_level is not None and player.level < grant.min_level:
+        return False
+    if grant.max_level is not None and player.level > grant.max_level:
+        return False
+    if grant.completed_quest is not None and grant.completed_quest not in player.completed_quests:
+        return False
+    return True
+
+def _grant_rewards(grant: RewardGrant) -> RewardGrantResult:
+    """Sélectionne les joueurs visés puis les récompense par lots (une écriture par lot)"""
+    usernames = set(grant.usernames) if grant.usernames is not None else None
+    targets = [
+        username for username, user_data in db.iter_users()
+        if _grant_matches(grant, usernames, User.from_dict(user_data))
+    ]
     
-    users = db.get_all_users()
-    quests = db.get_all_quests()
-    
-    total_users = len(users)
-    total_quests = len(quests)
-    
-    # ✅ CORRECTION : Calculer les quêtes terminées et en cours
-    total_completed = 0
-    total_in_progress = 0
+    def reward(player: User):
+        # Le joueur a pu changer depuis la sélection : on revérifie les filtres
+        if not _grant_matches(grant, usernames, player):
+            return None
+        leveled_up = player.add_xp(grant.xp)["leveled_up"] if grant.xp else False
+        player.money += grant.money
+        player.inventory.extend(grant.items)
+        return leveled_up
     
-    # Statistiques par utilisateur
-    user_stats = []
-    for username, user_data in users.items():
-        if not user_data.get("is_admin", False):
-            completed = user_data.get("completed_quests", [])
-            num_completed = len(completed)
-            total_completed += num_completed
-            
-            # En cours = total de quêtes - quêtes complétées
-            in_progress = total_quests - num_completed
-            total_in_progress += max(0, in_progress)
-            
-            user_stats.append({
-                "username": username,
-                "level": user_data.get("level", 1),
-                "completed_quests": num_completed
-            })
+    results = db.modify_users(targets, reward)
+    rewarded = {username: leveled_up for username, leveled_up in results.items() if leveled_up is not None}
+    logger.info("Rewards granted to %s player(s)", len(rewarded))
     
-    return {
-        "total_users": total_users,
-        "total_quests": total_quests,
-        "total_completed": total_completed,      # ✅ Nouveau
-        "total_in_progress": total_in_progress,  # ✅ Nouveau
-        "users": user_stats
-    }
+    return RewardGrantResult(
+        success=True,
+        players_rewarded=len(rewarded),
+        leveled_up=sum(rewarded.values()),
+        skipped=[username for username in targets if username not in rewarded]
+    )
 
 # ✅ NOUVELLE ROUTE : Nettoyer les IDs orphelins
 @router.post("/clean-orphan-quest-ids", response_model=dict)
@@ -249,25 +425,31 @@ async def clean_orphan_quest_ids(current_user: User = Depends(get_current_admin)
     """
     
     # Récupérer tous les IDs valides
-    quests = db.get_all_quests()
+    quests = await adb.get_all_quests()
     valid_ids = {q["id"] for q in quests}
     
-    users = db.get_all_users()
-    cleaned_count = 0
-    
-    for username, user_data in users.items():
-        old_completed = user_data.get("completed_quests", [])
-        new_completed = [qid for qid in old_completed if qid in valid_ids]
-        
-        if len(new_completed) != len(old_completed):
-            removed = set(old_completed) - set(new_completed)
-            user_data["completed_quests"] = new_completed
-            db.update_user(username, user_data)
-            cleaned_count += len(removed)
-            logger.info(f"Cleaned {len(removed)} orphan IDs from {username}: {removed}")
+    cleaned_count = await adb.run(_clean_players_orphan_ids, valid_ids)
     
     return {
         "success": True,
         "message": f"{cleaned_count} ID(s) orphelin(s) nettoyé(s)",
         "valid_quest_ids": list(valid_ids)
-    }
\ No newline at end of file
+    }
+
+def _clean_players_orphan_ids(valid_ids: set) -> int:
+    """Retire les IDs invalides de chaque joueur, retourne le nombre d'IDs retirés"""
+    cleaned_count = 0
+    
+    def clean(player: User) -> int:
+        old_completed = player.completed_quests
+        player.completed_quests = [qid for qid in old_completed if qid in valid_ids]
+        return len(old_completed) - len(player.completed_quests)
+    
+    for username, user_data in db.iter_users():
+        old_completed = CompletedQuests.decode(user_data.get("completed_quests"))
+        if any(qid not in valid_ids for qid in old_completed):
+            removed = db.modify_user(username, clean)
+            cleaned_count += removed
+            logger.info("Cleaned %s orphan IDs from %s", removed, username)
+    
+    return cleaned_count
\ No newline at end of file
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, HTTPException, status
 from app.schemas.auth import UserRegister, UserLogin, Token
-from app.auth.password import hash_password, verify_password
+from app.auth.password import hash_password_async, verify_password_async
 from app.auth.jwt_handler import create_access_token
-from app.database import db
+from app.database import adb
+from app.backends import VersionConflictError
 from app.models.user import User
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
@@ -12,7 +13,7 @@ async def register(user_data: UserRegister):
     """Inscription d'un nouvel utilisateur"""
     
     # Vérifier si l'utilisateur existe déjà
-    if db.user_exists(user_data.username):
+    if await adb.user_exists(user_data.username):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Ce nom d'utilisateur est déjà pris"
@@ -21,12 +22,18 @@ async def register(user_data: UserRegister):
     # Créer l'utilisateur
     user = User(
         username=user_data.username,
-        hashed_password=hash_password(user_data.password),
+        hashed_password=await hash_password_async(user_data.password),
         is_admin=user_data.is_admin
     )
     
-    # Sauvegarder
-    db.save_user(user.username, user.to_dict())
+    # Sauvegarder (expected_version=0 : échoue si le compte a été créé entre-temps)
+    try:
+        await adb.save_user(user.username, user.to_dict(), expected_version=0)
+    except VersionConflictError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Ce nom d'utilisateur est déjà pris"
+        )
     
     # Créer le token
     access_token = create_access_token(data={"sub": user.username})
@@ -47,7 +54,7 @@ async def login(credentials: UserLogin):
     """Connexion d'un utilisateur"""
     
     # Récupérer l'utilisateur
-    user_data = db.get_user(credentials.username)
+    user_data = await adb.get_user(credentials.username)
     if user_data is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -57,7 +64,7 @@ async def login(credentials: UserLogin):
     user = User.from_dict(user_data)
     
     # Vérifier le mot de passe
-    if not verify_password(credentials.password, user.hashed_password):
+    if not await verify_password_async(credentials.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Nom d'utilisateur ou mot de passe incorrect"
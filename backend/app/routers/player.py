@@ -1,108 +1,143 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
-from app.dependencies import get_current_user
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from app.auth.jwt_handler import create_stream_token
+from app.dependencies import get_current_user, get_current_user_from_query, get_quest_query
 from app.models.user import User
-from app.schemas.player import PlayerStatus, QuestResult
+from app.schemas.player import PlayerStatus, QuestResult, QuestBatchAttempt, QuestBatchItem, QuestBatchResult
 from app.schemas.quest import QuestWithStatus
-from app.database import db
-from app.quests.quest_factory import QuestFactory
+from app.config import settings
+from app.database import adb
+from app.etags import etag_headers, make_etag, not_modified, set_etag
+from app.quests.quest_catalog import CatalogSnapshot, CompiledQuest, quest_catalog
+from app.quests.player_quest_state import player_quest_states
+from app.quests.player_events import player_events  # Publie les sauvegardes vers event_hub
+from app.quests.quest_query import QuestQuery, select_quests
+from app.responses import extend_object, json_array
+from app.push import event_hub
+from app.instrumentation import HotLoopLogger
+import asyncio
 import logging
 
 # ✅ Ajouter du logging
 logger = logging.getLogger(__name__)
+# Boucles sur le catalogue : lignes échantillonnées, rien de formaté si DEBUG est désactivé
+hot_logger = HotLoopLogger(logger, every=settings.HOT_LOG_SAMPLE_EVERY)
 
 router = APIRouter(prefix="/player", tags=["Player"])
 
-@router.get("/status", response_model=PlayerStatus)
-async def get_player_status(current_user: User = Depends(get_current_user)):
-    """Récupère le statut du joueur"""
+def _player_status(player: User) -> PlayerStatus:
     return PlayerStatus(
-        name=current_user.name,
-        level=current_user.level,
-        xp=current_user.xp,
-        money=current_user.money,
-        inventory=current_user.inventory,
-        spoken_to_npc=current_user.spoken_to_npc,
-        completed_quests=current_user.completed_quests
+        name=player.name,
+        level=player.level,
+        xp=player.xp,
+        money=player.money,
+        inventory=player.inventory.to_list(),
+        inventory_counts=player.inventory.encode(),
+        spoken_to_npc=player.spoken_to_npc,
+        completed_quests=player.completed_quests
     )
 
+@router.get("/status", response_model=PlayerStatus)
+async def get_player_status(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user)
+):
+    """Récupère le statut du joueur (304 si la version du joueur n'a pas changé)"""
+    etag = make_etag("status", current_user.username, current_user.version)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    set_etag(response, etag)
+    
+    return _player_status(current_user)
+
 @router.get("/quests", response_model=List[QuestWithStatus])
-async def list_quests(current_user: User = Depends(get_current_user)):
-    """Liste toutes les quêtes avec leur statut"""
-    quests_data = db.get_all_quests()
-    result = []
+async def list_quests(
+    request: Request,
+    available_only: bool = False,
+    completed: Optional[bool] = None,
+    can_start: Optional[bool] = None,
+    query: QuestQuery = Depends(get_quest_query),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Liste les quêtes avec leur statut (available_only : seulement celles à commencer).
+    Filtres (type, completed, can_start, min_level, max_level), tri (sort, order)
+    et pagination (limit, cursor) ; le curseur de la page suivante est renvoyé
+    dans l'en-tête X-Next-Cursor. 304 si ni le catalogue ni le joueur n'ont changé.
+    """
+    def quests_etag(catalog_version: str) -> str:
+        return make_etag("quests", current_user.username, current_user.version,
+                         catalog_version, request.url.query)
     
-    # ✅ Debug: Afficher les quêtes complétées du joueur
-    logger.info(f"Player {current_user.username} completed quests: {current_user.completed_quests}")
+    # Validation avant de toucher au catalogue
+    cached = not_modified(request, quests_etag(await adb.get_quests_version()))
+    if cached:
+        return cached
     
-    for quest_data in quests_data:
-        quest_id = quest_data["id"]
-        
-        # ✅ Debug: Vérifier si la quête est dans les complétées
-        logger.info(f"Checking quest {quest_id}: in completed? {quest_id in current_user.completed_quests}")
-        
-        # Créer la quête avec ses décorateurs
-        quest_obj = QuestFactory.create_quest_from_dict(quest_data)
+    # Quêtes compilées une seule fois par version du catalogue
+    catalog = await adb.run(quest_catalog.snapshot)
+    headers = etag_headers(quests_etag(catalog.version))
+    query.completed = completed
+    query.can_start = can_start
+    
+    if available_only:
+        # Recherche par plage dans l'index par niveau, sans parcourir le catalogue
+        # (aucune quête disponible n'est complétée ou non commençable)
+        state = None
+        positions = [] if completed or can_start is False else catalog.index.available(current_user)
+    else:
+        logger.debug("Player %s completed quests: %s", current_user.username, current_user.completed_quests)
         
-        is_completed = quest_obj.is_completed(current_user)
-        can_start = quest_obj.can_start(current_user)
+        # Statuts tenus à jour par événement (recalculés seulement si périmés)
+        state = player_quest_states.get(current_user, catalog)
+        positions = None
+    
+    # Filtres, tri et page évalués sur les colonnes : seule la page est sérialisée
+    page = select_quests(catalog, query, state, positions)
+    if page.next_cursor:
+        headers["X-Next-Cursor"] = page.next_cursor
+    
+    result = []
+    for position in page.positions:
+        compiled = catalog.quests[position]
+        quest_data = compiled.data
+        quest_id = quest_data["id"]
         
-        # ✅ Debug: Afficher les résultats
-        logger.info(f"Quest {quest_id} - is_completed: {is_completed}, can_start: {can_start}")
+        if state is None:
+            is_completed, can_start = False, True
+        else:
+            is_completed = quest_id in state.completed
+            can_start = quest_id in state.available
+            hot_logger.debug("quest_status", quest_id=quest_id, is_completed=is_completed, can_start=can_start)
         
-        # Déterminer les conditions manquantes
+        # Les raisons ne sont calculées que pour les quêtes bloquées
         missing_requirements = []
         if not is_completed and not can_start:
-            for dec in quest_data.get("decorators", []):
-                if dec["type"] == "level_req":
-                    if current_user.level < dec["value"]:
-                        missing_requirements.append(f"Niveau {dec['value']} requis")
-                elif dec["type"] == "npc_req":
-                    if not current_user.spoken_to_npc:
-                        missing_requirements.append("Parler au PNJ requis")
+            _, missing_requirements = compiled.requirements.evaluate(current_user)
         
-        result.append(QuestWithStatus(
-            **quest_data,
-            is_completed=is_completed,
-            can_start=can_start,
-            missing_requirements=missing_requirements
-        ))
-    
-    return result
-
-@router.post("/quests/{quest_id}/complete", response_model=QuestResult)
-async def complete_quest(quest_id: int, current_user: User = Depends(get_current_user)):
-    """Tente de compléter une quête"""
-    
-    # Récupérer la quête
-    quest_data = db.get_quest(quest_id)
-    if quest_data is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Quête #{quest_id} introuvable"
-        )
-    
-    # Vérifier si déjà complétée
-    logger.info(f"Attempting quest {quest_id}, completed_quests: {current_user.completed_quests}")
+        # JSON de la quête mis en cache + champs de statut du joueur (forme QuestWithStatus)
+        result.append(extend_object(compiled.fragment, {
+            "is_completed": is_completed,
+            "can_start": can_start,
+            "missing_requirements": missing_requirements
+        }))
     
-    if quest_id in current_user.completed_quests:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Vous avez déjà complété cette quête"
-        )
-    
-    # Créer la quête avec ses décorateurs
-    quest_obj = QuestFactory.create_quest_from_dict(quest_data)
+    return json_array(result, headers)
+
+def _apply_quest(player: User, catalog: CatalogSnapshot, compiled: CompiledQuest) -> QuestResult:
+    """
+    Vérifie les conditions et applique la quête au joueur (sans sauvegarder).
+    L'appelant a déjà vérifié que la quête n'est pas complétée.
+    """
+    quest_data = compiled.data
+    quest_id = quest_data["id"]
     
     # Vérifier les conditions
-    if not quest_obj.can_start(current_user):
-        missing = []
-        for dec in quest_data.get("decorators", []):
-            if dec["type"] == "level_req" and current_user.level < dec["value"]:
-                missing.append(f"Niveau {dec['value']} requis (actuel: {current_user.level})")
-            elif dec["type"] == "npc_req" and not current_user.spoken_to_npc:
-                missing.append("Vous devez d'abord parler au PNJ")
-        
+    can_start, missing = compiled.requirements.evaluate(player, detailed=True)
+    if not can_start:
         return QuestResult(
             success=False,
             message="Conditions non remplies",
@@ -110,7 +145,7 @@ async def complete_quest(quest_id: int, current_user: User = Depends(get_current
         )
     
     # Compléter la quête
-    xp_result = current_user.add_xp(quest_data["base_xp"])
+    xp_result = player.add_xp(quest_data["base_xp"])
     
     # Ajouter les récompenses
     rewards = {
@@ -121,53 +156,167 @@ async def complete_quest(quest_id: int, current_user: User = Depends(get_current
     
     for dec in quest_data.get("decorators", []):
         if dec["type"] == "money_reward":
-            current_user.money += dec["value"]
+            player.money += dec["value"]
             rewards["money"] = dec["value"]
         elif dec["type"] == "item_reward":
-            current_user.inventory.append(dec["value"])
+            player.inventory.append(dec["value"])
             rewards.setdefault("items", []).append(dec["value"])
     
     # Marquer comme complétée
-    current_user.completed_quests.append(quest_id)
-    logger.info(f"Quest {quest_id} completed! New completed_quests: {current_user.completed_quests}")
+    player.completed_quests.append(quest_id)
+    logger.info("Quest %s completed! New completed_quests: %s", quest_id, player.completed_quests)
+    
+    # Seuls les successeurs directs dans le graphe des prérequis peuvent être débloqués
+    successors = [catalog.get(successor_id) for successor_id in catalog.graph.successors(quest_id)]
+    rewards["unlocked_quests"] = [
+        successor.data["id"]
+        for successor in successors
+        if successor.data["id"] not in player.completed_quests
+        and successor.requirements.prerequisites_met(player)
+    ]
     
     # 🔥 RESET INCONDITIONNEL DU PNJ
     # On force le joueur à retourner voir le PNJ après CHAQUE quête
-    current_user.spoken_to_npc = False
+    player.spoken_to_npc = False
     rewards["npc_reset"] = True
     
-    # Sauvegarder
-    db.update_user(current_user.username, current_user.to_dict())
-    
     return QuestResult(
         success=True,
         message=f"Quête '{quest_data['title']}' terminée !",
-        rewards=rewards,
-        player_status=PlayerStatus(
-            name=current_user.name,
-            level=current_user.level,
-            xp=current_user.xp,
-            money=current_user.money,
-            inventory=current_user.inventory,
-            spoken_to_npc=current_user.spoken_to_npc,  # Sera False ici
-            completed_quests=current_user.completed_quests
-        )
+        rewards=rewards
     )
 
+@router.post("/quests/{quest_id}/complete", response_model=QuestResult)
+async def complete_quest(quest_id: int, current_user: User = Depends(get_current_user)):
+    """Tente de compléter une quête"""
+    
+    # Récupérer la quête
+    catalog = await adb.run(quest_catalog.snapshot)
+    compiled = catalog.get(quest_id)
+    if compiled is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Quête #{quest_id} introuvable"
+        )
+    
+    def attempt(player: User) -> QuestResult:
+        """Appliquée à une version fraîche du joueur (rejouée en cas de conflit)"""
+        # Vérifier si déjà complétée
+        logger.info("Attempting quest %s, completed_quests: %s", quest_id, player.completed_quests)
+        
+        if quest_id in player.completed_quests:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Vous avez déjà complété cette quête"
+            )
+        
+        result = _apply_quest(player, catalog, compiled)
+        if result.success:
+            result.player_status = _player_status(player)  # spoken_to_npc sera False ici
+        return result
+    
+    # Lecture-modification-écriture protégée (sauvegarde seulement si succès)
+    return await adb.modify_user(current_user.username, attempt)
+
+@router.post("/quests/complete-batch", response_model=QuestBatchResult)
+async def complete_quests_batch(batch: QuestBatchAttempt, current_user: User = Depends(get_current_user)):
+    """
+    Tente plusieurs quêtes dans l'ordre donné. Chaque quête est évaluée sur
+    l'état laissé par les précédentes (niveau gagné, PNJ réinitialisé...) et le
+    joueur n'est sauvegardé qu'une fois, à la fin.
+    """
+    catalog = await adb.run(quest_catalog.snapshot)
+    
+    def attempt_all(player: User) -> QuestBatchResult:
+        """Appliquée à une version fraîche du joueur (rejouée en cas de conflit)"""
+        results = []
+        for quest_id in batch.quest_ids:
+            compiled = catalog.get(quest_id)
+            if compiled is None:
+                result = QuestResult(success=False, message=f"Quête #{quest_id} introuvable")
+            elif quest_id in player.completed_quests:
+                result = QuestResult(success=False, message="Vous avez déjà complété cette quête")
+            else:
+                result = _apply_quest(player, catalog, compiled)
+            results.append(QuestBatchItem(
+                quest_id=quest_id,
+                success=result.success,
+                message=result.message,
+                rewards=result.rewards
+            ))
+        
+        return QuestBatchResult(
+            completed=sum(1 for item in results if item.success),
+            results=results,
+            player_status=_player_status(player)
+        )
+    
+    # Une seule écriture pour tout le lot (aucune si rien n'a été complété)
+    return await adb.modify_user(current_user.username, attempt_all)
+
 @router.post("/talk-npc", response_model=dict)
 async def talk_to_npc(current_user: User = Depends(get_current_user)):
     """Parle au PNJ principal"""
     
-    if current_user.spoken_to_npc:
+    def talk(player: User) -> dict:
+        if player.spoken_to_npc:
+            return {
+                "success": False,
+                "message": "Vous avez déjà parlé au PNJ principal"
+            }
+        
+        player.spoken_to_npc = True
         return {
-            "success": False,
-            "message": "Vous avez déjà parlé au PNJ principal"
+            "success": True,
+            "message": "Vous avez parlé au PNJ ! Certaines quêtes sont maintenant accessibles.",
+            "player_status": _player_status(player)
         }
     
-    current_user.spoken_to_npc = True
-    db.update_user(current_user.username, current_user.to_dict())
-    
+    return await adb.modify_user(current_user.username, talk)
+
+@router.post("/events/token", response_model=dict)
+async def create_events_token(current_user: User = Depends(get_current_user)):
+    """Token court pour ouvrir /player/events (à demander avant chaque connexion)"""
     return {
-        "success": True,
-        "message": "Vous avez parlé au PNJ ! Certaines quêtes sont maintenant accessibles."
-    }
\ No newline at end of file
+        "token": create_stream_token(current_user.username),
+        "expires_in": settings.PUSH_TOKEN_EXPIRE_SECONDS
+    }
+
+@router.get("/events")
+async def player_events_stream(request: Request, current_user: User = Depends(get_current_user_from_query)):
+    """
+    Flux d'événements (server-sent events) : statut modifié ("player"), quêtes
+    débloquées ou verrouillées ("quests"), catalogue modifié ("catalog") et
+    "resync" si des événements ont été perdus. Token en paramètre ?token=...
+    obtenu via POST /player/events/token
+    """
+    if event_hub.is_full():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Trop de connexions ouvertes, réessayez plus tard"
+        )
+    
+    username = current_user.username
+    
+    async def stream():
+        queue = event_hub.subscribe(username)
+        try:
+            # Délai de reconnexion automatique d'EventSource (ms)
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=settings.PUSH_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    # Commentaire SSE : garde la connexion ouverte à travers les proxys
+                    message = ": ping\n\n"
+                yield message
+        finally:
+            event_hub.unsubscribe(username, queue)
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
\ No newline at end of file
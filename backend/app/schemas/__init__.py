@@ -2,8 +2,9 @@
 Schemas Pydantic pour validation des données
 """
 from .auth import UserRegister, UserLogin, Token
-from .player import PlayerStatus, QuestAttempt, QuestResult
+from .player import PlayerStatus, QuestAttempt, QuestResult, QuestBatchAttempt, QuestBatchItem, QuestBatchResult
 from .quest import QuestBase, QuestCreate, QuestUpdate, QuestInDB, QuestWithStatus
+from .admin import RewardGrant, RewardGrantResult
 
 __all__ = [
     'UserRegister',
@@ -12,9 +13,14 @@ __all__ = [
     'PlayerStatus',
     'QuestAttempt',
     'QuestResult',
+    'QuestBatchAttempt',
+    'QuestBatchItem',
+    'QuestBatchResult',
     'QuestBase',
     'QuestCreate',
     'QuestUpdate',
     'QuestInDB',
-    'QuestWithStatus'
+    'QuestWithStatus',
+    'RewardGrant',
+    'RewardGrantResult'
 ]
\ No newline at end of file
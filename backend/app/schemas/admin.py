@@ -0,0 +1,20 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+class RewardGrant(BaseModel):
+    """Récompenses à distribuer à un ensemble de joueurs (événements)"""
+    xp: int = Field(0, ge=0)
+    money: int = Field(0, ge=0)
+    items: List[str] = []
+    
+    # Filtres sur les joueurs visés (tous optionnels, cumulatifs ; admins exclus)
+    usernames: Optional[List[str]] = None
+    min_level: Optional[int] = None
+    max_level: Optional[int] = None
+    completed_quest: Optional[int] = None
+
+class RewardGrantResult(BaseModel):
+    success: bool
+    players_rewarded: int
+    leveled_up: int
+    skipped: List[str] = []
\ No newline at end of file
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
 
 class PlayerStatus(BaseModel):
     name: str
@@ -7,6 +7,8 @@ class PlayerStatus(BaseModel):
     xp: int
     money: int
     inventory: List[str]
+    # Même inventaire sous forme compacte : nom -> quantité
+    inventory_counts: Dict[str, int] = {}
     spoken_to_npc: bool
     completed_quests: List[int]
 
@@ -17,4 +19,19 @@ class QuestResult(BaseModel):
     success: bool
     message: str
     rewards: Optional[dict] = None
-    player_status: Optional[PlayerStatus] = None
\ No newline at end of file
+    player_status: Optional[PlayerStatus] = None
+
+class QuestBatchAttempt(BaseModel):
+    """Quêtes à tenter dans l'ordre, avec une seule sauvegarde du joueur"""
+    quest_ids: List[int] = Field(..., min_length=1, max_length=100)
+
+class QuestBatchItem(BaseModel):
+    quest_id: int
+    success: bool
+    message: str
+    rewards: Optional[dict] = None
+
+class QuestBatchResult(BaseModel):
+    completed: int
+    results: List[QuestBatchItem]
+    player_status: PlayerStatus
\ No newline at end of file
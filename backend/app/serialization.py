@@ -0,0 +1,114 @@
+"""
+Sérialisation des fichiers de données
+
+Formats disponibles (DATA_FORMAT) :
+- "json"    : JSON indenté, lisible (format historique, par défaut)
+- "compact" : JSON sans espaces
+- "msgpack" : binaire MessagePack (nécessite `pip install msgpack`)
+
+Si orjson est installé, il est utilisé automatiquement pour le JSON.
+La lecture détecte le format tout seul : on peut changer DATA_FORMAT
+sans convertir les fichiers existants (ils seront réécrits au fil des
+sauvegardes).
+"""
+import json
+import os
+import threading
+from app.config import settings
+from app.instrumentation import timed
+from app.metrics import storage_bytes_read, storage_bytes_written
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+FORMATS = ("json", "compact", "msgpack")
+
+# Premiers octets possibles d'un document JSON (hors espaces)
+_JSON_START_BYTES = b'{["-0123456789tfn'
+
+def _check_format(fmt: str):
+    if fmt not in FORMATS:
+        raise ValueError(f"Format de données inconnu: {fmt} ({', '.join(FORMATS)})")
+    if fmt == "msgpack" and msgpack is None:
+        raise ValueError("DATA_FORMAT=msgpack nécessite le paquet msgpack (pip install msgpack)")
+
+def dumps(data: any, fmt: str = None) -> bytes:
+    """Sérialise `data` dans le format demandé (DATA_FORMAT par défaut)"""
+    fmt = fmt or settings.DATA_FORMAT
+    _check_format(fmt)
+    
+    if fmt == "msgpack":
+        return msgpack.packb(data, use_bin_type=True)
+    
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if fmt == "json" else 0
+        return orjson.dumps(data, option=option)
+    
+    if fmt == "json":
+        return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode('utf-8')
+
+_UTF8_BOM = b'\xef\xbb\xbf'
+
+def detect_format(raw: bytes) -> str:
+    """Retourne "msgpack" ou "json" d'après le premier octet significatif"""
+    stripped = raw[len(_UTF8_BOM):] if raw.startswith(_UTF8_BOM) else raw
+    stripped = stripped.lstrip()
+    if not stripped or stripped[0] in _JSON_START_BYTES:
+        return "json"
+    return "msgpack"
+
+def loads(raw: bytes) -> any:
+    """
+    Désérialise un contenu JSON ou MessagePack (détection automatique)
+    
+    Raises:
+        ValueError: Si le contenu est invalide ou si msgpack n'est pas installé
+    """
+    if detect_format(raw) == "msgpack":
+        if msgpack is None:
+            raise ValueError("Fichier au format msgpack mais le paquet msgpack n'est pas installé")
+        return msgpack.unpackb(raw, raw=False, strict_map_key=False)
+    
+    if raw.startswith(_UTF8_BOM):
+        raw = raw[len(_UTF8_BOM):]
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw.decode('utf-8'))
+
+def read_file(filepath: str) -> any:
+    """Lit et désérialise un fichier de données"""
+    with timed("file.load"):
+        with open(filepath, 'rb') as f:
+            raw = f.read()
+        storage_bytes_read.inc(len(raw), source="file")
+        return loads(raw)
+
+def write_file(filepath: str, data: any, fmt: str = None) -> int:
+    """
+    Sérialise et écrit un fichier de données, retourne le nombre d'octets écrits.
+    Écriture atomique (fichier temporaire puis os.replace) : un lecteur, même
+    dans un autre worker, voit l'ancien ou le nouveau contenu, jamais un
+    fichier à moitié écrit.
+    """
+    with timed("file.save"):
+        raw = dumps(data, fmt)
+        # Nom propre au processus et au thread : deux écritures ne partagent jamais le même temporaire
+        tmp_file = f"{filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_file, 'wb') as f:
+                f.write(raw)
+            os.replace(tmp_file, filepath)
+        except BaseException:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+            raise
+    storage_bytes_written.inc(len(raw), source="file")
+    return len(raw)
\ No newline at end of file
@@ -2,6 +2,7 @@ import json
 import os
 from typing import Optional
 from backend.app.models.user import Player
+from app import serialization
 
 
 class PlayerStorage:
@@ -99,8 +100,7 @@ class PlayerStorage:
             return default_player
         
         try:
-            with open(self.file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = serialization.read_file(self.file_path)
             
             # Validation des données
             self._validate_player_data(data)
@@ -152,8 +152,7 @@ class PlayerStorage:
         try:
             self._ensure_data_directory()
             
-            with open(self.file_path, 'w', encoding='utf-8') as f:
-                json.dump(player_data, f, indent=2, ensure_ascii=False)
+            serialization.write_file(self.file_path, player_data)
                 
         except PermissionError:
             raise PermissionError(f"Impossible d'écrire dans {self.file_path}")
@@ -204,11 +203,11 @@ class PlayerStorage:
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
             backup_path = f"data/save_backup_{timestamp}.json"
         
-        # Copier le fichier
-        with open(self.file_path, 'r', encoding='utf-8') as source:
+        # Copier le fichier (copie binaire : fonctionne quel que soit le format)
+        with open(self.file_path, 'rb') as source:
             data = source.read()
         
-        with open(backup_path, 'w', encoding='utf-8') as dest:
+        with open(backup_path, 'wb') as dest:
             dest.write(data)
         
         return backup_path
@@ -231,15 +230,13 @@ class PlayerStorage:
             raise FileNotFoundError(f"Fichier de backup introuvable: {backup_path}")
         
         try:
-            with open(backup_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = serialization.read_file(backup_path)
             
             # Validation
             self._validate_player_data(data)
             
             # Sauvegarde
-            with open(self.file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            serialization.write_file(self.file_path, data)
             
             return self.load()
             
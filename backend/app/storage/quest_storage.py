@@ -1,6 +1,7 @@
 import json
 import os
 from typing import List, Dict, Optional
+from app import serialization
 
 
 class QuestStorage:
@@ -32,8 +33,7 @@ class QuestStorage:
             return []
         
         try:
-            with open(self.file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = serialization.read_file(self.file_path)
                 
             # Validation du format
             if not isinstance(data, list):
@@ -106,8 +106,7 @@ class QuestStorage:
         try:
             self._ensure_data_directory()
             
-            with open(self.file_path, 'w', encoding='utf-8') as f:
-                json.dump(quests, f, indent=2, ensure_ascii=False)
+            serialization.write_file(self.file_path, quests)
                 
         except PermissionError:
             raise PermissionError(f"Impossible d'écrire dans {self.file_path}")
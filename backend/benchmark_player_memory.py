@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark mémoire des représentations de joueurs utilisées pour l'analyse
+Chacune est construite depuis les mêmes octets sérialisés (comme à la
+lecture du stockage) : aucune ne partage de données avec une autre.
+- dicts bruts (tels que lus depuis le stockage)
+- User (dataclass avec __dict__)
+- UserRecord (__slots__)
+- PlayerTable (colonnes NumPy)
+Usage : python benchmark_player_memory.py [nombre_de_joueurs]
+À exécuter depuis backend/
+"""
+
+import gc
+import random
+import sys
+import time
+import tracemalloc
+
+from app import serialization
+from app.models.user import User, UserRecord, CompletedQuests, Inventory
+from app.models.player_table import PlayerTable
+
+ITEMS = ["Potion", "Épée", "Bouclier", "Parchemin", "Gemme"]
+
+def make_users(count: int) -> list:
+    """Joueurs synthétiques au format de stockage compact"""
+    rng = random.Random(42)
+    users = []
+    for i in range(count):
+        completed = rng.sample(range(1, 200), rng.randint(0, 60))
+        users.append(User(
+            username=f"player{i}",
+            hashed_password="$2b$12$" + "x" * 53,
+            level=rng.randint(1, 50),
+            xp=rng.randint(0, 5000),
+            money=rng.randint(0, 100000),
+            inventory=Inventory({item: rng.randint(0, 30) for item in rng.sample(ITEMS, 3)}),
+            completed_quests=CompletedQuests(completed)
+        ).to_dict())
+    return users
+
+def measure(label: str, build):
+    """Mémoire allouée (tracemalloc) et temps de construction d'une représentation"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return label, current, elapsed, result
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"👥 Génération de {count} joueurs...")
+    blobs = [serialization.dumps(user, "compact") for user in make_users(count)]
+    
+    def loaded():
+        return (serialization.loads(blob) for blob in blobs)
+    
+    results = [
+        measure("dicts bruts", lambda: list(loaded())),
+        measure("User (dataclass)", lambda: [User.from_dict(user) for user in loaded()]),
+        measure("UserRecord (__slots__)", lambda: [UserRecord.from_dict(user) for user in loaded()]),
+        measure("PlayerTable (NumPy)", lambda: PlayerTable.from_users((user["username"], user) for user in loaded())),
+    ]
+    
+    print(f"\n{'Représentation':<26}{'Mémoire':>12}{'Par joueur':>14}{'Construction':>14}")
+    print("-" * 66)
+    for label, size, elapsed, _ in results:
+        print(f"{label:<26}{size / 1024 / 1024:>10.1f} Mo{size / count:>12.0f} o{elapsed:>12.2f} s")
+    
+    # Temps d'une agrégation sur chaque représentation
+    records = results[2][3]
+    table = results[3][3]
+    start = time.perf_counter()
+    sum(record.completed_count for record in records if not record.is_admin)
+    loop_time = time.perf_counter() - start
+    start = time.perf_counter()
+    int(table.completed_counts[~table.is_admin].sum())
+    array_time = time.perf_counter() - start
+    print(f"\n⏱️  Total des quêtes complétées : boucle {loop_time * 1000:.1f} ms, colonnes {array_time * 1000:.2f} ms")
+
+if __name__ == "__main__":
+    print("📊 Benchmark mémoire des joueurs")
+    print("=" * 50)
+    main()
\ No newline at end of file
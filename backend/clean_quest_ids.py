@@ -4,10 +4,12 @@ Script de nettoyage des IDs orphelins dans users.json
 À exécuter depuis backend/
 """
 
-import json
 import sys
 from pathlib import Path
 
+from app import serialization
+from app.models.user import CompletedQuests
+
 def clean_orphan_ids():
     """Nettoie les IDs de quêtes qui n'existent plus"""
     
@@ -21,11 +23,8 @@ def clean_orphan_ids():
         sys.exit(1)
     
     # Charger les données
-    with open(users_file, 'r', encoding='utf-8') as f:
-        users = json.load(f)
-    
-    with open(quests_file, 'r', encoding='utf-8') as f:
-        quests = json.load(f)
+    users = serialization.read_file(users_file)
+    quests = serialization.read_file(quests_file)
     
     # IDs valides
     valid_ids = {q["id"] for q in quests}
@@ -34,7 +33,7 @@ def clean_orphan_ids():
     # Nettoyer chaque utilisateur
     total_cleaned = 0
     for username, user_data in users.items():
-        old_completed = user_data.get("completed_quests", [])
+        old_completed = CompletedQuests.decode(user_data.get("completed_quests"))
         new_completed = [qid for qid in old_completed if qid in valid_ids]
         
         if len(new_completed) != len(old_completed):
@@ -44,7 +43,7 @@ def clean_orphan_ids():
             print(f"   Après  : {new_completed}")
             print(f"   Retiré : {sorted(removed)}")
             
-            user_data["completed_quests"] = new_completed
+            user_data["completed_quests"] = CompletedQuests(new_completed).encode()
             total_cleaned += len(removed)
     
     if total_cleaned == 0:
@@ -53,12 +52,10 @@ def clean_orphan_ids():
     
     # Sauvegarder
     backup_file = users_file.with_suffix('.json.backup')
-    with open(backup_file, 'w', encoding='utf-8') as f:
-        json.dump(users, f, indent=2, ensure_ascii=False)
+    serialization.write_file(backup_file, users)
     print(f"\n💾 Backup créé : {backup_file}")
     
-    with open(users_file, 'w', encoding='utf-8') as f:
-        json.dump(users, f, indent=2, ensure_ascii=False)
+    serialization.write_file(users_file, users)
     
     print(f"\n✅ Nettoyage terminé ! {total_cleaned} ID(s) orphelin(s) retiré(s)")
     print(f"   Fichier mis à jour : {users_file}")
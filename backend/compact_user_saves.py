@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Script de compactage des sauvegardes joueurs
+- inventaire : liste de noms -> {"nom": quantité}
+- quêtes complétées : liste d'IDs -> bitset
+Fonctionne avec le moteur de stockage configuré (STORAGE_BACKEND)
+À exécuter depuis backend/
+"""
+
+import shutil
+from pathlib import Path
+
+from app import serialization
+from app.config import settings
+from app.database import db
+from app.backends import user_version
+from app.models.user import User
+
+BATCH_SIZE = 500
+
+def is_legacy(user_data: dict) -> bool:
+    """Vrai si la sauvegarde utilise encore un des anciens formats liste"""
+    return (
+        isinstance(user_data.get("inventory"), list)
+        or isinstance(user_data.get("completed_quests"), list)
+    )
+
+def compact_saves():
+    """Réécrit au format compact les joueurs encore au format liste"""
+    
+    # Backup du fichier unique en stockage JSON classique
+    if settings.STORAGE_BACKEND == "json" and Path(settings.USERS_DB_FILE).exists():
+        backup_file = Path(settings.USERS_DB_FILE).with_suffix('.json.backup')
+        shutil.copyfile(settings.USERS_DB_FILE, backup_file)
+        print(f"💾 Backup créé : {backup_file}")
+    
+    total_users = 0
+    bytes_before = 0
+    bytes_after = 0
+    updates = []
+    compacted = 0
+    conflicts = 0
+    
+    def flush():
+        nonlocal compacted, conflicts
+        versions = db.save_users(updates)
+        compacted += len(versions)
+        conflicts += len(updates) - len(versions)
+        updates.clear()
+    
+    for username, user_data in db.iter_users():
+        total_users += 1
+        if not is_legacy(user_data):
+            continue
+        
+        compact = User.from_dict(user_data).to_dict()
+        bytes_before += len(serialization.dumps(user_data, "compact"))
+        bytes_after += len(serialization.dumps(compact, "compact"))
+        updates.append((username, compact, user_version(user_data)))
+        
+        if len(updates) >= BATCH_SIZE:
+            flush()
+    
+    if updates:
+        flush()
+    
+    print(f"📂 {total_users} joueur(s) parcouru(s)")
+    
+    if compacted == 0 and conflicts == 0:
+        print("\n✅ Toutes les sauvegardes sont déjà au format compact !")
+        return
+    
+    print(f"\n✅ Compactage terminé ! {compacted} joueur(s) réécrit(s)")
+    print(f"   Taille des enregistrements : {bytes_before} -> {bytes_after} octets")
+    if conflicts:
+        print(f"⚠️  {conflicts} joueur(s) modifié(s) pendant le compactage : relancez le script")
+
+if __name__ == "__main__":
+    print("🗜️  Compactage des sauvegardes joueurs")
+    print("=" * 50)
+    compact_saves()
\ No newline at end of file
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Script de migration de users.json vers le stockage shardé (STORAGE_BACKEND=sharded)
+À exécuter depuis backend/
+"""
+
+import sys
+from pathlib import Path
+
+from app import serialization
+from app.config import settings
+from app.backends.sharded_storage import ShardedJSONStorage
+
+def migrate_users():
+    """Répartit les utilisateurs de USERS_DB_FILE dans les shards de USERS_SHARDS_DIR"""
+    
+    users_file = Path(settings.USERS_DB_FILE)
+    
+    if not users_file.exists():
+        print(f"❌ Fichier {users_file} introuvable")
+        print("   Assurez-vous d'être dans le dossier backend/")
+        sys.exit(1)
+    
+    users = serialization.read_file(users_file) or {}
+    
+    print(f"📂 {len(users)} utilisateur(s) trouvé(s) dans {users_file}")
+    
+    try:
+        storage = ShardedJSONStorage(
+            data_dir=settings.DATA_DIR,
+            shards_dir=settings.USERS_SHARDS_DIR,
+            quests_file=settings.QUESTS_DB_FILE,
+            shard_count=settings.USER_SHARDS
+        )
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    
+    migrated = storage.import_users(users)
+    
+    # Vérification
+    missing = [username for username in users if not storage.user_exists(username)]
+    if missing:
+        print(f"❌ {len(missing)} utilisateur(s) non migré(s) : {missing}")
+        sys.exit(1)
+    
+    print(f"\n✅ Migration terminée ! {migrated} utilisateur(s) répartis dans {settings.USER_SHARDS} shard(s)")
+    print(f"   Dossier : {settings.USERS_SHARDS_DIR}")
+    print(f"   {users_file} n'a pas été modifié (conservez-le comme backup)")
+    print("\n👉 Activez le stockage shardé dans .env : STORAGE_BACKEND=sharded")
+
+if __name__ == "__main__":
+    print("🗂️  Migration des utilisateurs vers le stockage shardé")
+    print("=" * 50)
+    migrate_users()
\ No newline at end of file
@@ -0,0 +1,18 @@
+"""
+Configuration des tests : données dans un dossier temporaire, fixée avant
+le premier import de l'application (les réglages sont lus à l'import)
+"""
+import os
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = tempfile.mkdtemp(prefix="quest_manager_tests_")
+
+os.environ.setdefault("SECRET_KEY", "test_secret_key_for_local_testing_only")
+os.environ["STORAGE_BACKEND"] = "json"
+os.environ["DATA_DIR"] = DATA_DIR
+os.environ["USERS_DB_FILE"] = os.path.join(DATA_DIR, "users.json")
+os.environ["QUESTS_DB_FILE"] = os.path.join(DATA_DIR, "quests_db.json")
+
+sys.path.insert(0, BACKEND_DIR)
\ No newline at end of file
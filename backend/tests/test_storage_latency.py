@@ -0,0 +1,56 @@
+"""
+Une sauvegarde lente ne doit pas bloquer la boucle asyncio : les autres
+requêtes restent rapides pendant qu'elle s'exécute dans le pool de threads
+"""
+import asyncio
+import time
+import httpx
+from app.auth.jwt_handler import create_access_token
+from app.database import adb, db
+from app.main import app
+from app.models.user import User
+
+SLOW_SAVE_SECONDS = 1.0
+MAX_STATUS_SECONDS = 0.25
+
+def _create_player(username: str) -> str:
+    user = User(username=username, hashed_password="x")
+    db.save_user(username, user.to_dict())
+    return create_access_token(data={"sub": username})
+
+def test_status_latency_stays_flat_during_slow_save(monkeypatch):
+    token = _create_player("reader")
+    _create_player("writer")
+    
+    original_save_user = db.storage.save_user
+    
+    def slow_save_user(*args, **kwargs):
+        time.sleep(SLOW_SAVE_SECONDS)  # gros fichier à sérialiser et écrire
+        return original_save_user(*args, **kwargs)
+    
+    monkeypatch.setattr(db.storage, "save_user", slow_save_user)
+    
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        headers = {"Authorization": f"Bearer {token}"}
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            # Requête de référence (imports, caches) avant la sauvegarde lente
+            assert (await client.get("/player/status", headers=headers)).status_code == 200
+            
+            save = asyncio.create_task(adb.save_user("writer", db.get_user("writer")))
+            await asyncio.sleep(0.05)
+            
+            latencies = []
+            for _ in range(5):
+                start = time.perf_counter()
+                response = await client.get("/player/status", headers=headers)
+                latencies.append(time.perf_counter() - start)
+                assert response.status_code == 200
+            
+            # Toutes les mesures ont eu lieu pendant la sauvegarde
+            assert not save.done()
+            await save
+        return latencies
+    
+    latencies = asyncio.run(scenario())
+    assert max(latencies) < MAX_STATUS_SECONDS, latencies
\ No newline at end of file
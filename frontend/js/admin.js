@@ -173,6 +173,7 @@ function displayDecorators(decorators) {
         let label = '';
         if (dec.type === 'level_req') label = `Niveau ${dec.value} requis`;
         else if (dec.type === 'npc_req') label = `PNJ requis: ${dec.value}`;
+        else if (dec.type === 'quest_req') label = `Quête #${dec.value} terminée`;
         else if (dec.type === 'money_reward') label = `+${dec.value} pièces`;
         // MODIFIÉ : Ajout de l'emoji si c'est un objet
         else if (dec.type === 'item_reward') {
@@ -183,7 +184,7 @@ function displayDecorators(decorators) {
         return `
             <div class="decorator-item">
                 <div class="decorator-info">
-                    <div class="decorator-type">${dec.type === 'level_req' || dec.type === 'npc_req' ? 'Condition' : 'Récompense'}</div>
+                    <div class="decorator-type">${['level_req', 'npc_req', 'quest_req'].includes(dec.type) ? 'Condition' : 'Récompense'}</div>
                     <div class="decorator-value">${label}</div>
                 </div>
                 <button class="btn-icon" onclick="removeDecorator(${index})" title="Supprimer">🗑️</button>
@@ -264,6 +265,10 @@ function updateDecoratorValueField() {
             newElement.type = 'text';
             newElement.placeholder = 'Nom du PNJ (ex: Ancien du village)';
             label.textContent = 'Nom du PNJ';
+        } else if (type === 'quest_req') {
+            newElement.type = 'number';
+            newElement.placeholder = 'ID de la quête à terminer avant';
+            label.textContent = 'ID de la quête';
         } else if (type === 'level_req' || type === 'money_reward') {
             newElement.type = 'number';
             newElement.placeholder = 'Entrez un nombre';
@@ -300,7 +305,7 @@ function addDecorator() {
     let parsedValue = value;
     
     // Conversion en nombre si nécessaire
-    if (type === 'level_req' || type === 'money_reward') {
+    if (type === 'level_req' || type === 'money_reward' || type === 'quest_req') {
         parsedValue = parseInt(value);
         if (isNaN(parsedValue)) {
             notify.error('La valeur doit être un nombre');
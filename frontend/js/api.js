@@ -4,19 +4,37 @@ class APIClient {
     constructor() {
         this.baseURL = API_BASE_URL;
         this.token = localStorage.getItem('token');
+        // 🗂️ Réponses GET validées par ETag : endpoint -> { etag, data, response }
+        this.etagCache = new Map();
     }
 
     setToken(token) {
         this.token = token;
+        this.etagCache.clear();
         localStorage.setItem('token', token);
     }
 
     clearToken() {
         this.token = null;
+        this.etagCache.clear();
         localStorage.removeItem('token');
     }
 
     async request(endpoint, options = {}) {
+        const { data } = await this.send(endpoint, options);
+        return data;
+    }
+
+    // Liste paginée : le curseur de la page suivante est dans l'en-tête X-Next-Cursor
+    async requestPage(endpoint) {
+        const { data, response } = await this.send(endpoint);
+        return {
+            items: data,
+            nextCursor: response.headers.get('X-Next-Cursor')
+        };
+    }
+
+    async send(endpoint, options = {}) {
         const headers = {
             'Content-Type': 'application/json',
             ...options.headers
@@ -26,6 +44,13 @@ class APIClient {
             headers['Authorization'] = `Bearer ${this.token}`;
         }
 
+        // Requête conditionnelle : le serveur répond 304 si rien n'a changé
+        const isGet = !options.method || options.method === 'GET';
+        const cached = isGet ? this.etagCache.get(endpoint) : null;
+        if (cached) {
+            headers['If-None-Match'] = cached.etag;
+        }
+
         const config = {
             ...options,
             headers
@@ -36,7 +61,12 @@ class APIClient {
             
             // ✅ CORRECTION : Gérer les réponses sans body (204 No Content)
             if (response.status === 204) {
-                return { success: true };
+                return { data: { success: true }, response };
+            }
+
+            // 304 : on resert le corps (et les en-têtes) de la réponse en cache
+            if (response.status === 304 && cached) {
+                return { data: cached.data, response: cached.response };
             }
 
             const data = await response.json();
@@ -45,7 +75,12 @@ class APIClient {
                 throw new Error(data.detail || 'Erreur réseau');
             }
 
-            return data;
+            const etag = response.headers.get('ETag');
+            if (isGet && etag) {
+                this.etagCache.set(endpoint, { etag, data, response });
+            }
+
+            return { data, response };
         } catch (error) {
             console.error('API Error:', error);
             throw error;
@@ -85,8 +120,19 @@ class APIClient {
         return await this.request('/player/status');
     }
 
-    async getQuests() {
-        return await this.request('/player/quests');
+    async getQuests(availableOnly = false) {
+        const query = availableOnly ? '?available_only=true' : '';
+        return await this.request(`/player/quests${query}`);
+    }
+
+    // filters : { type, completed, can_start, min_level, max_level, sort, order, limit, cursor }
+    async getQuestsPage(filters = {}) {
+        const params = new URLSearchParams();
+        Object.entries(filters).forEach(([key, value]) => {
+            if (value !== undefined && value !== null && value !== '') params.append(key, value);
+        });
+        const query = params.toString() ? `?${params}` : '';
+        return await this.requestPage(`/player/quests${query}`);
     }
 
     async completeQuest(questId) {
@@ -95,12 +141,27 @@ class APIClient {
         });
     }
 
+    // Plusieurs quêtes en une requête (évaluées dans l'ordre, une seule sauvegarde)
+    async completeQuests(questIds) {
+        return await this.request('/player/quests/complete-batch', {
+            method: 'POST',
+            body: JSON.stringify({ quest_ids: questIds })
+        });
+    }
+
     async talkToNPC() {
         return await this.request('/player/talk-npc', {
             method: 'POST'
         });
     }
 
+    // Token court pour ouvrir le flux /player/events (passé dans l'URL)
+    async getEventsToken() {
+        return await this.request('/player/events/token', {
+            method: 'POST'
+        });
+    }
+
     // Admin
     async getAllQuests() {
         return await this.request('/admin/quests');
@@ -9,10 +9,14 @@ const ITEM_ICONS = {
     "Coupe": "🏆"
 };
 
+// Dernier statut affiché (mis à jour en place par les événements du serveur)
+let currentStatus = null;
+
 async function loadPlayerStatus() {
     try {
         const status = await api.getPlayerStatus();
         console.log('📊 Player Status:', status);
+        currentStatus = status;
         displayPlayerStatus(status);
     } catch (error) {
         notify.error('Erreur lors du chargement du statut');
@@ -32,12 +36,16 @@ function displayPlayerStatus(status) {
     if (status.inventory.length === 0) {
         inventoryContainer.innerHTML = '<p style="text-align:center; color:#999;">Inventaire vide</p>';
     } else {
-        inventoryContainer.innerHTML = status.inventory.map(item => {
+        // Une case par objet avec sa quantité (inventory_counts), sinon une case par exemplaire
+        const counts = status.inventory_counts
+            ? Object.entries(status.inventory_counts)
+            : status.inventory.map(item => [item, 1]);
+        inventoryContainer.innerHTML = counts.map(([item, count]) => {
             const icon = ITEM_ICONS[item] || '🎒';
             return `
             <div class="inventory-item">
                 <div style="font-size: 2rem;">${icon}</div>
-                <div>${item}</div>
+                <div>${item}${count > 1 ? ` ×${count}` : ''}</div>
             </div>
             `;
         }).join('');
@@ -61,9 +69,17 @@ function displayPlayerStatus(status) {
     }
 }
 
+// 📄 Pagination de la liste des quêtes (curseur renvoyé par l'API)
+const QUESTS_PAGE_SIZE = 50;
+let loadedQuests = [];
+let questsCursor = null;
+
 async function loadQuests() {
     try {
-        const quests = await api.getQuests();
+        const page = await api.getQuestsPage({ limit: QUESTS_PAGE_SIZE });
+        const quests = page.items;
+        loadedQuests = quests;
+        questsCursor = page.nextCursor;
         console.log('🎯 Quests received:', quests);
         
         quests.forEach(q => {
@@ -82,6 +98,20 @@ async function loadQuests() {
     }
 }
 
+async function loadMoreQuests() {
+    if (!questsCursor) return;
+    
+    try {
+        const page = await api.getQuestsPage({ limit: QUESTS_PAGE_SIZE, cursor: questsCursor });
+        loadedQuests = loadedQuests.concat(page.items);
+        questsCursor = page.nextCursor;
+        displayQuests(loadedQuests);
+    } catch (error) {
+        notify.error('Erreur lors du chargement des quêtes');
+        console.error(error);
+    }
+}
+
 function displayQuests(quests) {
     const container = document.getElementById('questsList');
     
@@ -162,7 +192,11 @@ function displayQuests(quests) {
                 ` : ''}
             </div>
         `;
-    }).join('');
+    }).join('') + (questsCursor ? `
+        <button class="btn btn-primary mt-1" onclick="loadMoreQuests()">
+            Voir plus de quêtes
+        </button>
+    ` : '');
 }
 
 async function attemptQuest(questId, questTitle) {
@@ -174,7 +208,7 @@ async function attemptQuest(questId, questTitle) {
         
         if (result.success) {
             showQuestCompleteAnimation(questTitle, result.rewards);
-            await Promise.all([loadPlayerStatus(), loadQuests()]);
+            await applyActionResult(result);
         } else {
             notify.warning(result.message);
         }
@@ -199,6 +233,9 @@ function showQuestCompleteAnimation(questTitle, rewards) {
             rewardsHTML.push(`<div class="reward-item">${icon} ${item}</div>`);
         });
     }
+    if (rewards.unlocked_quests && rewards.unlocked_quests.length > 0) {
+        rewardsHTML.push(`<div class="reward-item">🔓 ${rewards.unlocked_quests.length} nouvelle(s) quête(s) débloquée(s)</div>`);
+    }
     if (rewards.leveled_up) {
         rewardsHTML.push(`<div class="reward-item level-up-badge">🎉 LEVEL UP! Niveau ${rewards.new_level}</div>`);
     }
@@ -234,7 +271,7 @@ async function talkToNPC() {
         
         if (result.success) {
             notify.success(result.message);
-            await Promise.all([loadPlayerStatus(), loadQuests()]);
+            await applyActionResult(result);
         } else {
             notify.info(result.message);
         }
@@ -244,6 +281,83 @@ async function talkToNPC() {
     }
 }
 
+// 📡 Mises à jour poussées par le serveur (server-sent events)
+let eventSource = null;
+// Le flux est propre à un worker : l'événement "quests" d'une action traitée
+// par un autre worker n'arrive jamais, la liste est alors rechargée après ce délai
+const QUESTS_EVENT_TIMEOUT_MS = 2000;
+const EVENTS_RECONNECT_MS = 5000;
+let questsReloadTimer = null;
+
+function eventsConnected() {
+    return eventSource !== null && eventSource.readyState === EventSource.OPEN;
+}
+
+// Statut renvoyé par la requête elle-même : affiché sans attendre le flux
+async function applyActionResult(result) {
+    if (result.player_status) {
+        currentStatus = result.player_status;
+        displayPlayerStatus(currentStatus);
+    } else {
+        await loadPlayerStatus();
+    }
+    
+    clearTimeout(questsReloadTimer);
+    if (eventsConnected()) {
+        questsReloadTimer = setTimeout(loadQuests, QUESTS_EVENT_TIMEOUT_MS);
+    } else {
+        await loadQuests();
+    }
+}
+
+function applyPlayerDelta(delta) {
+    if (!currentStatus) return;
+    
+    const { completed_quests_added = [], completed_quests_removed = [], ...fields } = delta;
+    Object.assign(currentStatus, fields);
+    // Le statut peut déjà venir de la réponse à l'action : pas de doublon
+    const completed = currentStatus.completed_quests.filter(id => !completed_quests_removed.includes(id));
+    currentStatus.completed_quests = completed
+        .concat(completed_quests_added.filter(id => !completed.includes(id)));
+    displayPlayerStatus(currentStatus);
+}
+
+async function connectEvents(resync = false) {
+    if (!window.EventSource || !api.token) return;
+    
+    // EventSource ne permet pas d'en-tête Authorization : token court (flux seulement) en paramètre
+    let token;
+    try {
+        ({ token } = await api.getEventsToken());
+    } catch (error) {
+        console.warn('📡 Flux d\'événements indisponible:', error);
+        return;
+    }
+    const source = new EventSource(`${api.baseURL}/player/events?token=${encodeURIComponent(token)}`);
+    eventSource = source;
+    
+    // Après une coupure, des événements ont pu être perdus
+    if (resync) source.addEventListener('open', () => Promise.all([loadPlayerStatus(), loadQuests()]));
+    source.addEventListener('player', (e) => applyPlayerDelta(JSON.parse(e.data)));
+    source.addEventListener('quests', (e) => {
+        const { unlocked } = JSON.parse(e.data);
+        if (unlocked.length > 0) console.log('🔓 Quêtes débloquées:', unlocked);
+        clearTimeout(questsReloadTimer);
+        loadQuests();
+    });
+    source.addEventListener('catalog', () => loadQuests());
+    source.addEventListener('resync', () => Promise.all([loadPlayerStatus(), loadQuests()]));
+    source.onerror = () => {
+        if (source.readyState === EventSource.CLOSED) {
+            // Reconnexion refusée (token court expiré) : nouveau token puis nouvelle connexion
+            if (eventSource === source) eventSource = null;
+            setTimeout(() => connectEvents(true), EVENTS_RECONNECT_MS);
+        } else {
+            console.warn('📡 Flux d\'événements interrompu, reconnexion...');
+        }
+    };
+}
+
 // Initialize on page load
 document.addEventListener('DOMContentLoaded', async () => {
     if (!auth.requireAuth()) return;
@@ -252,6 +366,7 @@ document.addEventListener('DOMContentLoaded', async () => {
     
     await loadPlayerStatus();
     await loadQuests();
+    connectEvents();
     
     const talkNPCBtn = document.getElementById('talkNPCBtn');
     if (talkNPCBtn) {